@@ -1,83 +1,333 @@
 import pickle
-import random
 import os
+import sys
 import numpy as np
 from config import *
+from game_env import NUM_STATES, encode_state, decode_state
+from rng import RandomStream
+from algorithms import make_algorithm
+from experience import ReplayBuffer
+from model_io import MappedQTable, save_qtables, load_qtables, save_history, load_history, history_file
+
+# Ligne renvoyée pour un état absent par les lectures (read_q) : rien n'est inséré dans la table
+ZERO_Q = np.zeros(len(ACTIONS), dtype=np.float32)
+ZERO_Q.flags.writeable = False
+
+def _initial_counts(values):
+    # Compteurs des lignes chargées d'un fichier (non enregistrés) : une ligne non nulle a été mise à jour,
+    # elle compte pour QTABLE_MIN_UPDATES et survit au compactage ; une ligne à zéro n'a jamais servi
+    return np.where((np.asarray(values) != 0).any(axis=1), QTABLE_MIN_UPDATES, 0).astype(np.uint32)
+
+class DenseQTable:
+    # Toutes les Q-valeurs dans un seul tableau float32[NUM_STATES, 4] indexé par encode_state,
+    # avec la même interface qu'un dict {état: q_values}, et le nombre de mises à jour de chaque état
+    def __init__(self, values=None, visited=None):
+        # values/visited peuvent pointer vers une mémoire partagée entre processus (voir parallel.py) ;
+        # les compteurs restent propres au processus
+        self.values = np.zeros((NUM_STATES, len(ACTIONS)), dtype=np.float32) if values is None else values
+        self.visited = np.zeros(NUM_STATES, dtype=bool) if visited is None else visited
+        self.counts = np.zeros(NUM_STATES, dtype=np.uint32)
+
+    def _index(self, state):
+        return state if isinstance(state, (int, np.integer)) else encode_state(state)
+
+    def get(self, state, default=None):
+        index = self._index(state)
+        return self.values[index] if self.visited[index] else default
+
+    def __getitem__(self, state):
+        index = self._index(state)
+        if not self.visited[index]: raise KeyError(state)
+        return self.values[index]
+
+    def __setitem__(self, state, q_values):
+        index = self._index(state)
+        self.values[index] = q_values
+        self.visited[index] = True
+
+    def __contains__(self, state):
+        return bool(self.visited[self._index(state)])
+
+    def __len__(self):
+        return int(np.count_nonzero(self.visited))
+
+    def update_row(self, state):
+        # Ligne à modifier (les valeurs d'un état absent sont déjà à zéro), compte une mise à jour
+        index = self._index(state)
+        self.visited[index] = True
+        self.counts[index] += 1
+        return self.values[index]
+
+    def update_rows(self, indices):
+        # Version par lot (états encodés) : un état répété dans le lot compte une fois
+        self.visited[indices] = True
+        self.counts[indices] += 1
+
+    def compact(self, min_updates):
+        # Oublie les états mis à jour moins de min_updates fois -> clés encodées supprimées
+        dropped = np.flatnonzero(self.visited & (self.counts < min_updates))
+        self.visited[dropped] = False
+        self.values[dropped] = 0
+        self.counts[dropped] = 0
+        return dropped.astype(np.int32)
+
+    def memory_bytes(self):
+        # Taille fixe, quel que soit le nombre d'états visités
+        return self.values.nbytes + self.visited.nbytes + self.counts.nbytes
+
+    def to_dict(self):
+        return {decode_state(i): self.values[i].astype(np.float32) for i in np.flatnonzero(self.visited)}
+
+    def pack(self):
+        keys = np.flatnonzero(self.visited).astype(np.int32)
+        return keys, self.values[keys]
+
+    def load(self, q_table):
+        if isinstance(q_table, DenseQTable):
+            self.values[:] = q_table.values
+            self.visited[:] = q_table.visited
+            self.counts[:] = q_table.counts
+        elif isinstance(q_table, MappedQTable):
+            keys, values = q_table.pack()
+            self.values[keys] = values
+            self.visited[keys] = True
+            self.counts[keys] = _initial_counts(values)
+        else:
+            counts = getattr(q_table, "counts", {})
+            for state, q_values in q_table.items():
+                self[state] = q_values
+                count = counts[state] if state in counts else (QTABLE_MIN_UPDATES if np.any(q_values) else 0)
+                self.counts[self._index(state)] = count
+
+    @classmethod
+    def from_dict(cls, q_table):
+        table = cls()
+        table.load(q_table)
+        return table
+
+class QDict(dict):
+    # Backend "DICT" : {état: Q-valeurs float32} et, à côté, {état: nombre de mises à jour}
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.counts = {}
+
+    def update_row(self, state):
+        row = self.get(state)
+        if row is None:
+            row = self[state] = np.zeros(len(ACTIONS), dtype=np.float32)
+        self.counts[state] = self.counts.get(state, 0) + 1
+        return row
+
+    def compact(self, min_updates):
+        dropped = [state for state in self if self.counts.get(state, 0) < min_updates]
+        for state in dropped:
+            del self[state]
+            self.counts.pop(state, None)
+        return np.array([encode_state(state) for state in dropped], dtype=np.int32)
+
+    def memory_bytes(self):
+        # Estimation : conteneurs + une entrée type (tuple d'état, ligne NumPy, compteur) par état
+        size = sys.getsizeof(self) + sys.getsizeof(self.counts)
+        if self:
+            state, row = next(iter(self.items()))
+            size += len(self) * (sys.getsizeof(state) + sum(sys.getsizeof(x) for x in state) + sys.getsizeof(row))
+        return size
+
+    @classmethod
+    def from_table(cls, q_table):
+        # dict, MappedQTable ou DenseQTable -> QDict (lignes float32 copiées)
+        items = q_table.to_dict().items() if hasattr(q_table, "to_dict") else q_table.items()
+        table = cls()
+        for state, q_values in items:
+            table[state] = np.array(q_values, dtype=np.float32)
+        counts = getattr(q_table, "counts", None)
+        if isinstance(counts, dict):
+            table.counts.update(counts)
+        elif table:
+            keys = list(table)
+            table.counts.update(zip(keys, _initial_counts([table[k] for k in keys]).tolist()))
+        return table
 
 class QLearningAgent:
-    def __init__(self):
-        self.q_table = {} 
-        self.q_table_2 = {}
+    def __init__(self, backend=Q_BACKEND, seed=None, algorithm=ALGORITHM):
+        self.backend = backend
+        self.algorithm = make_algorithm(algorithm)
+        self.random = RandomStream(seed)
+        self.q_table = self._new_table()
+        self.q_table_2 = self._new_table()
         
+        # Hyperparamètres propres à l'agent (valeurs de config.py, remplaçables par instance : voir sweep.py)
         self.epsilon = EPSILON_START
+        self.epsilon_decay = EPSILON_DECAY_RATE
         self.alpha = ALPHA_START
+        self.alpha_min = ALPHA_MIN
+        self.alpha_decay = ALPHA_DECAY_RATE
         self.gamma = GAMMA
+        self.lam = LAMBDA
+        # Traces d'éligibilité creuses : {(état, action, table): (ligne de Q-valeurs, trace)}
+        self.traces = {}
+        # États mis à jour depuis le dernier checkpoint (activé par checkpoint.Checkpointer)
+        self.touched = None
+        # Mémoire d'expérience (enable_replay) : un lot rejoué tous les replay_every pas
+        self.replay = None
+        self.replay_steps = 0
+        self.replayed = set()  # états (encodés) modifiés par les lots, décodés seulement au checkpoint
         
+    def _new_table(self):
+        return DenseQTable() if self.backend == "DENSE" else QDict()
+
+    def as_backend(self, table):
+        if self.backend == "DENSE":
+            return table if isinstance(table, DenseQTable) else DenseQTable.from_dict(table)
+        return table if isinstance(table, QDict) else QDict.from_table(table)
+
     def get_q(self, state, table=1):
+        # Ligne de l'état à mettre à jour : créée au besoin, compte une mise à jour
         target_table = self.q_table if table == 1 else self.q_table_2
-        if state not in target_table:
-            target_table[state] = np.zeros(len(ACTIONS))
-        return target_table[state]
+        return target_table.update_row(state)
+
+    def read_q(self, state, table=1):
+        # Lecture seule (état suivant, choix glouton) : un état inconnu vaut zéro et n'est pas inséré
+        target_table = self.q_table if table == 1 else self.q_table_2
+        q_vals = target_table.get(state)
+        return ZERO_Q if q_vals is None else q_vals
+
+    def compact(self, min_updates=QTABLE_MIN_UPDATES):
+        # Oublie les états mis à jour moins de min_updates fois -> clés encodées supprimées de chaque table
+        return [table.compact(min_updates) for table in (self.q_table, self.q_table_2)]
+
+    def memory_bytes(self):
+        return sum(table.memory_bytes() for table in (self.q_table, self.q_table_2) if hasattr(table, "memory_bytes"))
 
     def choose_action(self, state, training=True):
-        if training and random.random() < self.epsilon:
-            return random.choice(ACTIONS)
-        
-        q1 = self.get_q(state, 1)
+        if training and self.random.random() < self.epsilon:
+            return self.random.choice(ACTIONS)
         
-        if ALGORITHM == "DOUBLE_Q":
-            q2 = self.get_q(state, 2)
-            q_vals = q1 + q2 
-        else:
-            q_vals = q1
-            
+        q_vals = self.algorithm.values(self, state)
         max_q = np.max(q_vals)
         actions_with_max_q = np.where(q_vals == max_q)[0]
-        return int(random.choice(actions_with_max_q))
+        return int(self.random.choice(actions_with_max_q))
 
     def update(self, state, action, reward, next_state, next_action=None):
-        if ALGORITHM == "QLEARNING":
-            q_vals = self.get_q(state)
-            old_q = q_vals[action]
-            next_q_vals = self.get_q(next_state)
-            target = reward + self.gamma * np.max(next_q_vals)
-            self.q_table[state][action] += self.alpha * (target - old_q)
-            
-        elif ALGORITHM == "SARSA":
-            if next_action is None: return
-            q_vals = self.get_q(state)
-            old_q = q_vals[action]
-            next_q_vals = self.get_q(next_state)
-            target = reward + self.gamma * next_q_vals[next_action]
-            self.q_table[state][action] += self.alpha * (target - old_q)
+        if self.touched is not None: self.touched.add(state)
+        self.algorithm.update(self, state, action, reward, next_state, next_action)
+        if self.replay is not None:
+            self.replay.add(encode_state(state), action, reward, encode_state(next_state), next_action)
+            self.replay_steps += 1
+            if self.replay_steps % self.replay_every == 0 and len(self.replay) >= self.replay_batch:
+                self.replay_update()
+
+    def enable_replay(self, capacity=EXPERIENCE_SIZE, batch_size=EXPERIENCE_BATCH, every=EXPERIENCE_EVERY,
+                      prioritized=EXPERIENCE_PRIORITIZED):
+        # Graine tirée du flux de l'agent : reproductible avec --seed
+        self.replay = ReplayBuffer(capacity, prioritized, seed=int(self.random.random() * 2 ** 32))
+        self.replay_batch = batch_size
+        self.replay_every = every
+
+    def replay_update(self):
+        indices, batch, weights = self.replay.sample(self.replay_batch)
+        delta = self.algorithm.batch_update(self, batch, weights)
+        self.replay.update_priorities(indices, delta)
+        if self.touched is not None:
+            self.replayed.update(batch[0].tolist())
+
+    def batch_rows(self, table, states, next_states):
+        # Q-valeurs d'un lot d'états encodés -> (tableau, lignes des états, lignes des états suivants, rows).
+        # Table dense : le tableau complet, modifié sur place. Dict : copie des lignes concernées,
+        # à réécrire avec write_rows (rows = lignes d'origine).
+        target_table = self.q_table if table == 1 else self.q_table_2
+        if isinstance(target_table, DenseQTable):
+            target_table.update_rows(states)
+            return target_table.values, states, next_states, None
+        unique, inverse = np.unique(np.concatenate([states, next_states]), return_inverse=True)
+        updated = set(states.tolist())
+        # Seuls les états mis à jour sont insérés ; les états suivants sont lus (rows = None)
+        rows = [self.get_q(decode_state(i), table) if i in updated else None for i in unique.tolist()]
+        values = np.array([row if row is not None else self.read_q(decode_state(i), table)
+                           for i, row in zip(unique.tolist(), rows)])
+        return values, inverse[:len(states)], inverse[len(states):], rows
+
+    def batch_read(self, table, states):
+        # Lecture seule d'un lot d'états encodés -> (tableau, lignes des états)
+        target_table = self.q_table if table == 1 else self.q_table_2
+        if isinstance(target_table, DenseQTable):
+            return target_table.values, states
+        unique, inverse = np.unique(states, return_inverse=True)
+        return np.array([self.read_q(decode_state(i), table) for i in unique.tolist()]), inverse
+
+    def write_rows(self, values, rows):
+        if rows is None: return
+        for row, new in zip(rows, values):
+            if row is not None: row[:] = new
+
+    def _trace_update(self, state, action, table, q_vals, delta, keep):
+        # Trace remplaçante pour (état, action), puis mise à jour de toutes les paires encore éligibles.
+        # Les traces décroissent de gamma * lambda par pas et disparaissent sous TRACE_CUTOFF :
+        # le coût par pas reste borné (~log(TRACE_CUTOFF) / log(gamma * lambda) paires).
+        self.traces[(state, action, table)] = (q_vals, 1.0)
+        step = self.alpha * delta
+        decay = self.gamma * self.lam if keep else 0.0
+        traces = {}
+        for key, (row, trace) in self.traces.items():
+            row[key[1]] += step * trace
+            trace *= decay
+            if trace >= TRACE_CUTOFF:
+                traces[key] = (row, trace)
+        self.traces = traces
+
+    def reset_traces(self):
+        # Fin d'épisode
+        self.traces = {}
+
+    def take_touched(self):
+        # États modifiés depuis le dernier appel ; ceux qui ont encore une trace seront modifiés
+        # à nouveau sans repasser par update, ils restent donc suivis
+        touched = self.touched
+        if touched is not None and self.replayed:
+            touched.update(decode_state(i) for i in self.replayed)
+            self.replayed = set()
+        self.touched = {key[0] for key in self.traces}
+        return touched
 
     def decay_epsilon(self):
-        self.epsilon = max(0.0, self.epsilon * EPSILON_DECAY_RATE)
+        self.epsilon = max(0.0, self.epsilon * self.epsilon_decay)
 
-        self.alpha = max(ALPHA_MIN, self.alpha * ALPHA_DECAY_RATE)
+        self.alpha = max(self.alpha_min, self.alpha * self.alpha_decay)
 
     def save_model(self, filename=MODEL_FILE, history=None):
-        data = {
-            "q_table": self.q_table,
-            "q_table_2": self.q_table_2,
-            "epsilon": self.epsilon,
-            "history": history
-        }
-        with open(filename, 'wb') as f:
-            pickle.dump(data, f)
+        save_qtables(filename, [self.q_table, self.q_table_2], self.epsilon, self.alpha)
+        if history is not None:
+            save_history(history_file(filename), history)
         print(f"Modèle et historique sauvegardés dans {filename}")
     
-    def load_model(self, filename=MODEL_FILE):
-        if os.path.exists(filename):
-            with open(filename, 'rb') as f:
-                data = pickle.load(f)
-                
-            self.q_table = data["q_table"]
-            self.q_table_2 = data.get("q_table_2", {})
-            self.epsilon = data.get("epsilon", self.epsilon)
-            
-            print(f"Modèle chargé depuis {filename}")
-            return data.get("history", None) 
-        else:
+    def load_model(self, filename=MODEL_FILE, mmap=False):
+        # mmap=True : Q-Tables projetées en mémoire en lecture seule (play / évaluation)
+        if not os.path.exists(filename) and filename == MODEL_FILE and os.path.exists(LEGACY_MODEL_FILE):
+            filename = LEGACY_MODEL_FILE
+        if not os.path.exists(filename):
             print("Aucun modèle trouvé.")
-            return None
\ No newline at end of file
+            return None
+        if filename.endswith(".pkl"):
+            return self._load_pickle(filename)
+
+        tables, self.epsilon, self.alpha = load_qtables(filename)
+        if mmap:
+            self.q_table, self.q_table_2 = tables
+            # Jeu glouton : un modèle entraîné en Double Q (seconde table remplie) se joue avec Q1 + Q2
+            if len(self.q_table_2): self.algorithm = make_algorithm("DOUBLE_Q")
+        else:
+            self.q_table, self.q_table_2 = (self.as_backend(t) for t in tables)
+        
+        print(f"Modèle chargé depuis {filename}")
+        return load_history(history_file(filename))
+
+    def _load_pickle(self, filename):
+        with open(filename, 'rb') as f:
+            data = pickle.load(f)
+            
+        self.q_table = self.as_backend(data["q_table"])
+        self.q_table_2 = self.as_backend(data.get("q_table_2", {}))
+        self.epsilon = data.get("epsilon", self.epsilon)
+        
+        print(f"Modèle chargé depuis {filename} (ancien format, voir model_io.py pour le convertir)")
+        return data.get("history", None) 
@@ -0,0 +1,103 @@
+import numpy as np
+from config import *
+
+# Règles de mise à jour de QLearningAgent. Chaque agent reçoit sa propre instance à la création :
+# plusieurs algorithmes peuvent tourner côte à côte dans un même processus, et update/choose_action
+# appellent directement la bonne méthode au lieu de comparer ALGORITHM à chaque pas.
+# batch_update applique un lot de la mémoire d'expérience (experience.py) en une fois :
+# états encodés, cibles calculées en NumPy et np.add.at pour cumuler les doublons du lot.
+
+class QLearning:
+    name = "QLEARNING"
+
+    def values(self, agent, state):
+        # copie : avec --workers, la ligne peut être modifiée par un autre processus entre max et where
+        return agent.read_q(state).copy()
+
+    def update(self, agent, state, action, reward, next_state, next_action):
+        q_vals = agent.get_q(state)
+        old_q = q_vals[action]
+        next_q_vals = agent.read_q(next_state)
+        max_next = np.max(next_q_vals)
+        target = reward + agent.gamma * max_next
+        if agent.lam:
+            # Watkins : les traces sont coupées dès que l'action suivante n'est pas gloutonne
+            greedy = next_action is not None and next_q_vals[next_action] == max_next
+            agent._trace_update(state, action, 1, q_vals, target - old_q, greedy)
+        else:
+            q_vals[action] += agent.alpha * (target - old_q)
+
+    def batch_update(self, agent, batch, weights):
+        states, actions, rewards, next_states, next_actions, dones = batch
+        values, s, ns, rows = agent.batch_rows(1, states, next_states)
+        target = rewards + agent.gamma * values[ns].max(axis=1) * ~dones
+        return _apply(agent, values, rows, s, actions, target, weights)
+
+class Sarsa(QLearning):
+    name = "SARSA"
+
+    def update(self, agent, state, action, reward, next_state, next_action):
+        if next_action is None: return
+        q_vals = agent.get_q(state)
+        old_q = q_vals[action]
+        next_q_vals = agent.read_q(next_state)
+        target = reward + agent.gamma * next_q_vals[next_action]
+        if agent.lam:
+            agent._trace_update(state, action, 1, q_vals, target - old_q, True)
+        else:
+            q_vals[action] += agent.alpha * (target - old_q)
+
+    def batch_update(self, agent, batch, weights):
+        # Action suivante enregistrée avec la transition (politique de l'époque)
+        states, actions, rewards, next_states, next_actions, dones = batch
+        values, s, ns, rows = agent.batch_rows(1, states, next_states)
+        target = rewards + agent.gamma * values[ns, np.maximum(next_actions, 0)] * ~dones
+        return _apply(agent, values, rows, s, actions, target, weights)
+
+class DoubleQ:
+    # Double Q-learning (van Hasselt) : une table choisit l'action suivante, l'autre l'évalue,
+    # ce qui corrige la surestimation du max ; la table mise à jour est tirée à pile ou face
+    name = "DOUBLE_Q"
+
+    def values(self, agent, state):
+        return agent.read_q(state, 1) + agent.read_q(state, 2)
+
+    def update(self, agent, state, action, reward, next_state, next_action):
+        table, other = (1, 2) if agent.random.random() < 0.5 else (2, 1)
+        q_vals = agent.get_q(state, table)
+        old_q = q_vals[action]
+        best = int(np.argmax(agent.read_q(next_state, table)))
+        target = reward + agent.gamma * agent.read_q(next_state, other)[best]
+        if agent.lam:
+            # Les traces des deux tables sont partagées ; coupure de Watkins sur la politique (Q1 + Q2)
+            next_q_vals = self.values(agent, next_state)
+            greedy = next_action is not None and next_q_vals[next_action] == np.max(next_q_vals)
+            agent._trace_update(state, action, table, q_vals, target - old_q, greedy)
+        else:
+            q_vals[action] += agent.alpha * (target - old_q)
+
+    def batch_update(self, agent, batch, weights):
+        # Une table tirée à pile ou face par lot
+        states, actions, rewards, next_states, next_actions, dones = batch
+        table, other = (1, 2) if agent.random.random() < 0.5 else (2, 1)
+        values, s, ns, rows = agent.batch_rows(table, states, next_states)
+        other_values, other_ns = agent.batch_read(other, next_states)
+        best = values[ns].argmax(axis=1)
+        target = rewards + agent.gamma * other_values[other_ns, best] * ~dones
+        return _apply(agent, values, rows, s, actions, target, weights)
+
+def _apply(agent, values, rows, s, actions, target, weights):
+    # Erreurs TD du lot (renvoyées pour les priorités), puis mise à jour cumulée
+    delta = target - values[s, actions]
+    np.add.at(values, (s, actions), agent.alpha * weights * delta)
+    agent.write_rows(values, rows)
+    return delta
+
+ALGORITHMS = {cls.name: cls for cls in (QLearning, Sarsa, DoubleQ)}
+
+def make_algorithm(algorithm=ALGORITHM):
+    # Nom ("QLEARNING", "SARSA", "DOUBLE_Q") ou instance déjà construite
+    if not isinstance(algorithm, str): return algorithm
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Algorithme inconnu : {algorithm} (choix : {', '.join(ALGORITHMS)})")
+    return ALGORITHMS[algorithm]()
@@ -0,0 +1,51 @@
+import os
+import sys
+import json
+import platform
+import argparse
+import datetime
+
+# Rendu sans fenêtre : à définir avant le premier import de pygame
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+from benchmarks.maps import benchmark_maps
+from benchmarks.suite import COMPONENTS, run_suite, compare
+
+def main():
+    maps = benchmark_maps()
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--maps", nargs="+", choices=list(maps), default=list(maps))
+    parser.add_argument("--components", nargs="+", choices=COMPONENTS, default=COMPONENTS)
+    parser.add_argument("--min-time", type=float, default=0.5, help="durée de mesure par composant (s)")
+    parser.add_argument("--output", default="models/benchmark.json")
+    parser.add_argument("--baseline", help="résultats JSON de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=0.2, help="ralentissement toléré (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = run_suite({name: maps[name] for name in args.maps}, args.components, args.min_time)
+    report = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Résultats enregistrés dans {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} régression(s) au-delà de {args.threshold:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
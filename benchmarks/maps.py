@@ -0,0 +1,35 @@
+from config import *
+from maps import GameMap, load_map
+
+def tile_map(game_map, rows, cols):
+    # Carte plus grande : la carte de base répétée rows x cols fois, avec des passages percés dans les
+    # murs mitoyens, au plus près du milieu là où les couloirs des deux copies se font face.
+    # La copie en haut à gauche garde les positions de départ de la carte de base.
+    base = game_map.grid
+    h, w = game_map.shape
+    grid = [[base[r % h][c % w] for c in range(w * cols)] for r in range(h * rows)]
+
+    door_r = _door(range(h), lambda r: base[r][w - 2] != WALL and base[r][1] != WALL)
+    door_c = _door(range(w), lambda c: base[h - 2][c] != WALL and base[1][c] != WALL)
+    for tr in range(rows):
+        for tc in range(cols - 1):
+            r, c = tr * h + door_r, (tc + 1) * w
+            grid[r][c - 1] = grid[r][c] = EMPTY
+    for tr in range(rows - 1):
+        for tc in range(cols):
+            r, c = (tr + 1) * h, tc * w + door_c
+            grid[r - 1][c] = grid[r][c] = EMPTY
+    return GameMap(grid, game_map.pacman_start, game_map.ghost_starts, f"{game_map.name}_{rows}x{cols}")
+
+def _door(cells, is_open):
+    middle = len(cells) // 2
+    return min((i for i in cells if is_open(i)), key=lambda i: abs(i - middle))
+
+def benchmark_maps():
+    default = load_map("default")
+    return {
+        "default": default,
+        "tiled_2x2": tile_map(default, 2, 2),
+        "tiled_4x4": tile_map(default, 4, 4),
+        "classic": load_map("classic"),
+    }
@@ -0,0 +1,170 @@
+import gc
+import time
+import random
+import tracemalloc
+import numpy as np
+from config import *
+from game_env import PacmanEnv
+from vec_env import VecPacmanEnv
+from agent import QLearningAgent
+
+COMPONENTS = ["env.step", "env.get_state", "agent.choose_action", "agent.update", "renderer.render", "vec_env.step"]
+
+def measure(call, prepare=None, units=1, min_time=0.5, repeats=3, alloc_calls=200):
+    # Temps : meilleur de `repeats` séries calibrées pour durer ~min_time/repeats chacune.
+    # prepare() (optionnel) est appelé avant chaque appel mesuré et n'est pas chronométré.
+    def run(count):
+        if prepare is None:
+            start = time.perf_counter_ns()
+            for _ in range(count): call()
+            return time.perf_counter_ns() - start
+        total = 0
+        for _ in range(count):
+            prepare()
+            start = time.perf_counter_ns()
+            call()
+            total += time.perf_counter_ns() - start
+        return total
+
+    count = 1
+    while run(count) < min_time / repeats * 1e9 / 4:
+        count *= 2
+    count *= 4
+    gc.collect()
+    ns_per_call = min(run(count) for _ in range(repeats)) / count
+
+    # Mémoire : octets alloués transitoirement par appel (pic tracemalloc pendant l'appel),
+    # octets conservés et pic sur toute la série
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    transient = 0
+    for _ in range(alloc_calls):
+        if prepare is not None: prepare()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+        transient += peak - before
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "calls": count,
+        "ns_per_call": ns_per_call,
+        "steps_per_sec": units * 1e9 / ns_per_call,
+        "alloc_bytes_per_call": transient / alloc_calls,
+        "retained_bytes_per_call": (current - base) / alloc_calls,
+    }
+
+def peak_memory(call, calls=1000):
+    tracemalloc.start()
+    for _ in range(calls): call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+class RandomPlay:
+    # Partie à actions aléatoires (graine fixe) qui enchaîne niveaux et parties
+    def __init__(self, env, seed=0):
+        self.env = env
+        self.rng = random.Random(seed)
+        self.state = env.reset()
+
+    def step(self):
+        action = self.rng.randrange(len(ACTIONS))
+        state, reward, done, info = self.env.step(action)
+        if info.get("level_cleared", False):
+            state = self.env.next_level()
+            done = False
+        transition = (self.state, action, reward, state)
+        self.state = self.env.reset() if done else state
+        return transition
+
+def collect_transitions(env, count, seed=0):
+    play = RandomPlay(env, seed)
+    return [play.step() for _ in range(count)]
+
+def cycle(items):
+    # Appel sans argument qui parcourt `items` en boucle
+    it = iter(())
+    def next_item():
+        nonlocal it
+        try:
+            return next(it)
+        except StopIteration:
+            it = iter(items)
+            return next(it)
+    return next_item
+
+def bench_component(name, game_map, min_time):
+    env = PacmanEnv(game_map, seed=0)
+
+    if name == "env.step":
+        play = RandomPlay(env)
+        return measure(play.step, min_time=min_time), peak_memory(play.step)
+
+    if name == "env.get_state":
+        play = RandomPlay(env)
+        return measure(env.get_state, prepare=play.step, min_time=min_time), peak_memory(env.get_state)
+
+    transitions = collect_transitions(env, 5000)
+    agent = QLearningAgent(seed=0)
+    agent.epsilon = 0.1
+    for state, action, reward, next_state in transitions:
+        agent.update(state, action, reward, next_state, action)
+
+    if name == "agent.choose_action":
+        states = cycle([t[0] for t in transitions])
+        call = lambda: agent.choose_action(states())
+        return measure(call, min_time=min_time), peak_memory(call)
+
+    if name == "agent.update":
+        items = cycle(transitions)
+        def call():
+            state, action, reward, next_state = items()
+            agent.update(state, action, reward, next_state, action)
+        return measure(call, min_time=min_time), peak_memory(call)
+
+    if name == "renderer.render":
+        from graphics import GameRenderer
+        renderer = GameRenderer(env)
+        renderer.fps = 0
+        play = RandomPlay(env)
+        info = {'episode': 0, 'epsilon': 0.1}
+        call = lambda: renderer.render(info_dict=info)
+        result = measure(call, prepare=play.step, min_time=min_time, alloc_calls=50)
+        renderer.close()
+        return result, None
+
+    if name == "vec_env.step":
+        vec_env = VecPacmanEnv(256, seed=0, game_map=game_map)
+        rng = np.random.default_rng(0)
+        actions = cycle(list(rng.integers(0, len(ACTIONS), size=(64, vec_env.num_envs))))
+        call = lambda: vec_env.step(actions())
+        return measure(call, units=vec_env.num_envs, min_time=min_time, alloc_calls=50), None
+
+    raise ValueError(f"Composant inconnu : {name}")
+
+def run_suite(maps, components=COMPONENTS, min_time=0.5):
+    results = {}
+    for map_name, game_map in maps.items():
+        for name in components:
+            measured = bench_component(name, game_map, min_time)
+            if measured is None: continue
+            result, peak = measured
+            if peak is not None: result["peak_bytes"] = peak
+            results[f"{map_name}/{name}"] = result
+            print(f"{map_name + '/' + name:<32} {result['ns_per_call']:>12.0f} ns/appel {result['steps_per_sec']:>12.0f} pas/s "
+                  f"{result['alloc_bytes_per_call']:>10.0f} o/appel")
+    return results
+
+def compare(results, baseline, threshold):
+    # Régression si un composant est plus lent que la référence de plus de `threshold` (0.2 = 20%)
+    regressions = []
+    for key, base in baseline.items():
+        if key not in results: continue
+        ratio = results[key]["ns_per_call"] / base["ns_per_call"]
+        flag = "RÉGRESSION" if ratio > 1 + threshold else ""
+        print(f"{key:<32} {base['ns_per_call']:>12.0f} -> {results[key]['ns_per_call']:>12.0f} ns  x{ratio:.2f} {flag}")
+        if flag: regressions.append(key)
+    return regressions
@@ -0,0 +1,211 @@
+import os
+import time
+import numpy as np
+from config import *
+from metrics import RollingMean
+
+# Courbes d'apprentissage. matplotlib n'est importé que si un graphique est réellement demandé :
+# un entraînement sans --graphics ne charge ni backend ni cache de polices.
+
+def _pyplot():
+    import matplotlib.pyplot as plt
+    return plt
+
+class MinMaxDecimator:
+    # Sous-échantillonnage incrémental pour l'affichage : au plus `max_buckets` seaux (min, max).
+    # Quand ils sont tous pleins, les seaux voisins fusionnent deux à deux et la largeur double.
+    def __init__(self, max_buckets=CHART_MAX_POINTS // 2):
+        self.max_buckets = max_buckets
+        self.width = 1
+        self.fill = 0
+        self.buckets = []  # [x_min, y_min, x_max, y_max]
+
+    def add(self, x, y):
+        if self.buckets and self.fill < self.width:
+            b = self.buckets[-1]
+            if y < b[1]: b[0], b[1] = x, y
+            if y > b[3]: b[2], b[3] = x, y
+            self.fill += 1
+            return
+        if len(self.buckets) == self.max_buckets:
+            self._merge()
+        self.buckets.append([x, y, x, y])
+        self.fill = 1
+
+    def _merge(self):
+        merged = []
+        for a, b in zip(self.buckets[0::2], self.buckets[1::2]):
+            lo = a if a[1] <= b[1] else b
+            hi = a if a[3] >= b[3] else b
+            merged.append([lo[0], lo[1], hi[2], hi[3]])
+        self.buckets = merged
+        self.width *= 2
+
+    def points(self):
+        if not self.buckets: return [], []
+        b = np.array(self.buckets, dtype=float)
+        first = b[:, 0] <= b[:, 2]
+        xs = np.where(first[:, None], b[:, [0, 2]], b[:, [2, 0]]).ravel()
+        ys = np.where(first[:, None], b[:, [1, 3]], b[:, [3, 1]]).ravel()
+        return xs, ys
+
+class TrainingChart:
+    SERIES = ['scores', 'avg_scores', 'epsilons', 'ghosts_eaten', 'avg_ghosts', 'max_levels', 'avg_levels']
+
+    def __init__(self, visual=True):
+        self.visual = visual
+        
+        # Sans affichage, aucune figure n'est créée : seul l'historique est tenu (checkpoints, save_plot)
+        if self.visual:
+            plt = _pyplot()
+            plt.ion()
+            self.fig, (self.ax1, self.ax2, self.ax3) = plt.subplots(3, 1, figsize=(8, 10), sharex=True)
+            self.fig.canvas.manager.set_window_title("Metrics")
+            self._create_lines()
+        
+        self.episodes = []
+        self.scores = []
+        self.epsilons = []
+        self.ghosts_eaten = []
+        
+        self.avg_scores = []
+        self.avg_ghosts = []
+        self.avg_levels = []
+        self.max_levels = []
+        
+        self._reset_stats()
+        self.next_draw = 0.0
+
+    def _reset_stats(self):
+        self.rolling = {'scores': RollingMean(50), 'ghosts_eaten': RollingMean(50), 'max_levels': RollingMean(50)}
+        self.decimators = {name: MinMaxDecimator() for name in self.SERIES} if self.visual else {}
+
+    def _create_lines(self):
+        # Artistes créés une seule fois, _draw ne fait que mettre à jour leurs données
+        self.lines = {}
+        self.lines['scores'], = self.ax1.plot([], [], color='lightgray', alpha=0.5, label='Raw Score')
+        self.lines['avg_scores'], = self.ax1.plot([], [], color='blue', linewidth=2, label='Avg Score')
+        self.ax1.set_ylabel('Score')
+        self.ax1.legend(loc='upper left')
+        
+        self.ax1_twin = self.ax1.twinx()
+        self.lines['epsilons'], = self.ax1_twin.plot([], [], color='orange', linestyle='--', label='Epsilon', alpha=0.7)
+        self.ax1_twin.set_ylabel('Epsilon', color='orange')
+        self.ax1_twin.set_ylim(0, 1.1)
+        
+        self.lines['ghosts_eaten'], = self.ax2.plot([], [], color='lightgray', alpha=0.5)
+        self.lines['avg_ghosts'], = self.ax2.plot([], [], color='red', linewidth=2, label='Avg Ghosts')
+        self.ax2.set_ylabel('Ghosts Eaten')
+        self.ax2.legend(loc='upper left')
+        
+        self.lines['max_levels'], = self.ax3.plot([], [], color='lightgray', alpha=0.5)
+        self.lines['avg_levels'], = self.ax3.plot([], [], color='green', linewidth=2, label='Avg Level')
+        self.ax3.set_ylabel('Max Level')
+        self.ax3.set_xlabel('Episode')
+        self.ax3.legend(loc='upper left')
+        
+        self.fig.tight_layout()
+
+    def history(self):
+        return {
+            'episodes': self.episodes,
+            'scores': self.scores,
+            'avg_scores': self.avg_scores,
+            'epsilons': self.epsilons,
+            'ghosts_eaten': self.ghosts_eaten,
+            'avg_ghosts': self.avg_ghosts,
+            'avg_levels': self.avg_levels,
+            'max_levels': self.max_levels
+        }
+
+    def restore(self, history):
+        self.episodes = history.get('episodes', [])
+        self.scores = history.get('scores', [])
+        self.avg_scores = history.get('avg_scores', [])
+        self.epsilons = history.get('epsilons', [])
+        
+        self.ghosts_eaten = history.get('ghosts_eaten', []) 
+        self.avg_ghosts = history.get('avg_ghosts', [])
+        
+        self.max_levels = history.get('max_levels', []) 
+        self.avg_levels = history.get('avg_levels', [])
+        
+        self._reset_stats()
+        for name, rolling in self.rolling.items():
+            for value in getattr(self, name)[-rolling.window:]:
+                rolling.add(value)
+        for name, decimator in self.decimators.items():
+            for x, y in zip(self.episodes, getattr(self, name)):
+                decimator.add(x, y)
+        
+    def update(self, episode, score, epsilon, ghosts_eaten, level):
+        self.episodes.append(episode)
+        self.scores.append(score)
+        self.epsilons.append(epsilon)
+        self.ghosts_eaten.append(ghosts_eaten)
+        self.max_levels.append(level)
+        
+        self.avg_scores.append(self.rolling['scores'].add(score))
+        self.avg_ghosts.append(self.rolling['ghosts_eaten'].add(ghosts_eaten))
+        self.avg_levels.append(self.rolling['max_levels'].add(level))
+        
+        if self.visual:
+            for name, decimator in self.decimators.items():
+                decimator.add(episode, getattr(self, name)[-1])
+            # Redessin limité dans le temps plutôt qu'à chaque N épisodes ; si un dessin est lent,
+            # l'intervalle s'allonge pour que l'affichage ne dépasse pas ~20% du temps d'entraînement
+            start = time.monotonic()
+            if start >= self.next_draw:
+                self._draw()
+                _pyplot().pause(0.001)
+                end = time.monotonic()
+                self.next_draw = end + max(CHART_REDRAW_SECONDS, 4 * (end - start))
+            
+    def _draw(self):
+        # Coût borné : au plus CHART_MAX_POINTS points par courbe, quelle que soit la longueur de l'historique
+        for name, line in self.lines.items():
+            line.set_data(*self.decimators[name].points())
+        for ax in (self.ax1, self.ax2, self.ax3):
+            ax.relim()
+            ax.autoscale_view()
+        self.ax1_twin.relim()
+        self.ax1_twin.autoscale_view(scalex=True, scaley=False)
+    
+    def save_plot(self, filename="models/training_plot.png"):
+        if not self.episodes: return
+        
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        if not self.visual:
+            # Figure hors pyplot : ni fenêtre ni choix de backend interactif, rendu PNG par Agg
+            from matplotlib.figure import Figure
+            fig = Figure(figsize=(8, 10))
+            axs = fig.subplots(3, 1, sharex=True)
+            fig.suptitle('Entraînement Pac-Man')
+            
+            ax1 = axs[0]
+            ax1.plot(self.episodes, self.scores, color='lightgray', alpha=0.5, label='Raw Score')
+            ax1.plot(self.episodes, self.avg_scores, color='blue', label='Avg Score')
+            ax1.set_ylabel('Score')
+            ax1.legend(loc='upper left')
+            
+            ax2 = ax1.twinx()
+            ax2.plot(self.episodes, self.epsilons, color='orange', linestyle='--', alpha=0.7, label='Epsilon')
+            ax2.set_ylabel('Epsilon', color='orange')
+            
+            axs[1].plot(self.episodes, self.ghosts_eaten, color='lightgray', alpha=0.5)
+            axs[1].plot(self.episodes, self.avg_ghosts, color='red', label='Avg Ghosts')
+            axs[1].set_ylabel('Ghosts Eaten')
+            axs[1].legend(loc='upper left')
+            
+            axs[2].plot(self.episodes, self.max_levels, color='lightgray', alpha=0.5)
+            axs[2].plot(self.episodes, self.avg_levels, color='green', label='Avg Level')
+            axs[2].set_ylabel('Max Level')
+            axs[2].set_xlabel('Episode')
+            axs[2].legend(loc='upper left')
+            
+            fig.savefig(filename)
+        else:
+            self.fig.savefig(filename)
+            
+    def close(self):
+        if self.visual: _pyplot().close(self.fig)
@@ -0,0 +1,137 @@
+import os
+import glob
+import time
+import queue
+import threading
+from collections import deque
+import numpy as np
+from config import *
+from game_env import encode_state
+from agent import DenseQTable
+from model_io import pack_table, save_qtables, load_qtables, save_history, history_file
+
+def checkpoint_files(directory=CHECKPOINT_DIR):
+    # Du plus ancien au plus récent par date d'écriture : le dossier peut contenir les checkpoints d'un
+    # entraînement précédent avec des numéros d'épisode plus grands
+    files = glob.glob(os.path.join(directory, "ckpt_*.bin"))
+    return sorted(files, key=lambda f: (os.stat(f).st_mtime_ns, f))
+
+def latest_checkpoint(directory=CHECKPOINT_DIR):
+    # Le plus récent checkpoint lisible (en-tête valide, données complètes, historique présent)
+    for filename in reversed(checkpoint_files(directory)):
+        try:
+            load_qtables(filename)
+        except (OSError, ValueError) as e:
+            print(f"Checkpoint {filename} ignoré : {e}")
+            continue
+        if os.path.exists(history_file(filename)):
+            return filename
+    return None
+
+def _pack_states(table, states):
+    states = [state for state in states if state in table]
+    keys = np.array([encode_state(state) for state in states], dtype=np.int32)
+    values = np.array([table[state] for state in states], dtype=np.float32).reshape(-1, len(ACTIONS))
+    return keys, values
+
+class Checkpointer:
+    # Sauvegarde périodique pendant l'entraînement. Le thread principal ne copie que ce qui a changé
+    # depuis le dernier checkpoint (états mis à jour, nouvelles lignes d'historique) ; un thread
+    # d'écriture reconstruit l'état complet, écrit le fichier et garde les `keep` derniers.
+    def __init__(self, agent, chart, every_episodes=CHECKPOINT_EVERY, every_seconds=CHECKPOINT_SECONDS,
+                 keep=CHECKPOINT_KEEP, directory=CHECKPOINT_DIR, incremental=True):
+        self.agent = agent
+        self.chart = chart
+        self.every_episodes = every_episodes
+        self.every_seconds = every_seconds
+        self.keep = keep
+        self.directory = directory
+        # incremental=False : copie complète à chaque fois (Q-Tables partagées avec --workers)
+        self.incremental = incremental
+        os.makedirs(directory, exist_ok=True)
+
+        self.last_time = time.time()
+        self.episode = None        # dernier épisode terminé
+        self.saved_episode = None  # dernier épisode sauvegardé
+        self.full_snapshot = True
+        self.history_sent = 0
+        if incremental:
+            agent.touched = set()
+
+        # État complet côté thread d'écriture
+        self.shadow_tables = [DenseQTable(), DenseQTable()]
+        self.shadow_history = {}
+        self.written = deque()  # checkpoints écrits par cet entraînement, seuls concernés par la rotation
+
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+
+    def maybe_save(self, episode):
+        self.episode = episode
+        if self.every_episodes and episode % self.every_episodes == 0:
+            self.save(episode)
+        elif self.every_seconds and time.time() - self.last_time >= self.every_seconds:
+            self.save(episode)
+
+    def save(self, episode):
+        self.last_time = time.time()
+        self.saved_episode = episode
+        # Compactage avant la copie : les états oubliés sont aussi retirés de l'état complet du thread d'écriture.
+        # Pas avec --workers : les compteurs de mises à jour restent dans chaque worker.
+        dropped = self.agent.compact() if self.incremental else None
+        self.queue.put((episode, self._snapshot(), dropped, self.agent.epsilon, self.agent.alpha, self._history_delta()))
+
+    def _snapshot(self):
+        tables = [self.agent.q_table, self.agent.q_table_2]
+        if self.full_snapshot or not self.incremental:
+            self.full_snapshot = False
+            if self.incremental: self.agent.take_touched()
+            return [pack_table(table) for table in tables]
+        touched = self.agent.take_touched()
+        return [_pack_states(table, touched) for table in tables]
+
+    def _history_delta(self):
+        history = self.chart.history()
+        end = len(history['episodes'])
+        delta = {k: list(v[self.history_sent:end]) for k, v in history.items()}
+        self.history_sent = end
+        return delta
+
+    def _writer(self):
+        while True:
+            item = self.queue.get()
+            if item is None: break
+            episode = item[0]
+            try:
+                self._write(*item)
+            except OSError as e:
+                print(f"Échec du checkpoint de l'épisode {episode} : {e}")
+
+    def _write(self, episode, tables, dropped, epsilon, alpha, history):
+        for shadow, keys in zip(self.shadow_tables, dropped or []):
+            shadow.visited[keys] = False
+            shadow.values[keys] = 0
+        for shadow, (keys, values) in zip(self.shadow_tables, tables):
+            shadow.values[keys] = values
+            shadow.visited[keys] = True
+        for k, v in history.items():
+            self.shadow_history.setdefault(k, []).extend(v)
+
+        filename = os.path.join(self.directory, f"ckpt_{episode:08d}.bin")
+        # Historique d'abord : un .bin présent implique un checkpoint complet
+        save_history(history_file(filename), self.shadow_history)
+        save_qtables(filename, self.shadow_tables, epsilon, alpha)
+
+        if filename not in self.written: self.written.append(filename)
+        while len(self.written) > self.keep:
+            old = self.written.popleft()
+            if os.path.exists(old): os.remove(old)
+            if os.path.exists(history_file(old)): os.remove(history_file(old))
+
+    def close(self):
+        # Fin d'entraînement (normale ou Ctrl+C) : dernier checkpoint pour que --resume reparte d'ici
+        if self.episode is not None and self.episode != self.saved_episode:
+            self.save(self.episode)
+        self.queue.put(None)
+        self.thread.join()
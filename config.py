@@ -24,13 +24,27 @@ MAX_GHOST_SPEED = 0.9           # Plafond vitesse
 POWER_DURATION_BASE = 30        # Pas de temps
 POWER_DURATION_DEC_PER_LEVEL = 2
 MIN_POWER_DURATION = 10
+# Distance utilisée par les fantômes (poursuite/fuite) et pour la direction de la nourriture dans l'état :
+# "MANHATTAN" (à travers les murs, compatible avec les anciennes Q-Tables) / "MAZE" (plus court chemin)
+DISTANCE = "MANHATTAN"
 
 # --- Hyperparamètres Modèle ---
-ALGORITHM = "QLEARNING" # "QLEARNING" / "SARSA"
+ALGORITHM = "QLEARNING" # "QLEARNING" / "SARSA" / "DOUBLE_Q" (défaut de --algorithm)
+Q_BACKEND = "DICT"      # "DICT" (dict d'états) / "DENSE" (tableau float32 indexé par encode_state)
+QTABLE_MIN_UPDATES = 1  # compactage aux checkpoints : états mis à jour moins de N fois oubliés (0 = jamais)
 ALPHA_START = 0.2
 ALPHA_MIN = 0.05
 ALPHA_DECAY_RATE = 0.999995
 GAMMA = 0.95
+LAMBDA = 0.0            # traces d'éligibilité Q(λ)/SARSA(λ) (0 = mise à jour à un pas)
+TRACE_CUTOFF = 0.01     # une trace plus faible que ce seuil est oubliée
+EXPERIENCE_SIZE = 0     # mémoire d'expérience (transitions gardées, 0 = désactivée)
+EXPERIENCE_BATCH = 64   # transitions rejouées par lot
+EXPERIENCE_EVERY = 4    # un lot rejoué tous les K pas
+EXPERIENCE_PRIORITIZED = False # tirage selon l'erreur TD au lieu d'uniforme
+PRIORITY_ALPHA = 0.6    # importance de l'erreur TD dans la priorité (0 = uniforme)
+PRIORITY_BETA = 0.4     # correction du biais de tirage (1 = complète)
+PRIORITY_EPS = 1e-3     # priorité minimale d'une transition
 EPSILON_START = 1.0
 EPSILON_DECAY_RATE = 0.99998
 TOTAL_EPISODES = 5000   
@@ -46,6 +60,9 @@ R_DEATH = -500
 R_WIN = 1000
 R_GAME_WIN = 5000
 
+CHART_REDRAW_SECONDS = 0.5  # intervalle minimal entre deux redessins du graphique en direct
+CHART_MAX_POINTS = 2000     # points max par courbe affichée (sous-échantillonnage min/max)
+
 # --- Couleurs & Style ---
 BLACK = (0, 0, 0)
 NAVY = (0, 0, 50)
@@ -68,19 +85,22 @@ GHOST_COLORS = [
 SCARED_COLOR = (0, 0, 255) 
 
 # --- Chemins ---
-MODEL_FILE = "models/qtable.pkl"
+MODEL_FILE = "models/qtable.bin"
+POLICY_FILE = "models/policy.bin"  # politique gloutonne figée (policy.py)
+LEGACY_MODEL_FILE = "models/qtable.pkl" # ancien format pickle (voir model_io.py pour la conversion)
+CHECKPOINT_DIR = "models/checkpoints"
+CHECKPOINT_EVERY = 500     # épisodes (0 = désactivé)
+CHECKPOINT_SECONDS = 600   # secondes (0 = désactivé)
+CHECKPOINT_KEEP = 3        # nombre de checkpoints conservés
 LOG_FILE = "models/training_log.csv"
-if not os.path.exists("models"): os.makedirs("models")
+LOG_DIR = "models/training_log"  # journal binaire par colonnes
+LOG_FORMAT = "CSV"               # "CSV" / "BINARY"
+LOG_BATCH_SIZE = 1000            # épisodes par écriture
+REPLAY_FILE = "models/replays.npz"  # épisodes enregistrés (graine + actions), voir replay.py
+SWEEP_DIR = "models/sweep"  # résultats des recherches d'hyperparamètres (sweep.py)
 
-# Carte
-GAME_MAP = [
-    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-    [1, 2, 2, 2, 2, 2, 1, 2, 2, 2, 2, 2, 1],
-    [1, 2, 1, 1, 1, 2, 1, 2, 1, 1, 1, 2, 1],
-    [1, 3, 1, 2, 2, 2, 2, 2, 2, 2, 1, 3, 1],
-    [1, 2, 1, 2, 1, 1, 2, 1, 1, 2, 1, 2, 1],
-    [1, 2, 2, 2, 1, 2, 2, 2, 1, 2, 2, 2, 1],
-    [1, 2, 1, 1, 1, 2, 1, 2, 1, 1, 1, 2, 1],
-    [1, 2, 2, 2, 2, 2, 1, 2, 2, 2, 2, 2, 1],
-    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
-]
+# Carte (voir maps.py) : dossiers relatifs au projet, quel que soit le dossier de lancement
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+MAPS_DIR = os.path.join(PROJECT_DIR, "maps")
+MAP = "default"                       # nom d'une carte de maps/ ou chemin d'un fichier .txt / .json
+MAZE_CACHE_DIR = os.path.join(PROJECT_DIR, "models", "maze_cache")  # cartes compilées mises en cache (maze.py)
@@ -0,0 +1,103 @@
+import multiprocessing as mp
+import signal
+import time
+import numpy as np
+from config import *
+from game_env import PacmanEnv
+from maps import load_map
+from agent import QLearningAgent
+from policy import load_player
+from replay import save_recordings
+
+EVAL_COLUMNS = ["score", "level", "ghosts", "won", "steps"]
+
+_worker = None
+
+def _init_worker(filename, game_map=None):
+    # Un modèle projeté en mémoire (ou une politique figée) par processus : les pages du fichier sont partagées par l'OS
+    global _worker
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker = (PacmanEnv(game_map), load_player(filename))
+
+def run_episode(env, agent, seed):
+    # Partie gloutonne (training=False) ; la graine par épisode rend le résultat indépendant du découpage en workers
+    state = env.reset(seed=seed)
+    if isinstance(agent, QLearningAgent): agent.random.seed(seed)
+    steps = 0
+    done = False
+    while not done:
+        action = agent.choose_action(state, training=False)
+        state, _, done, info = env.step(action)
+        steps += 1
+        if info.get("level_cleared", False):
+            state = env.next_level()
+            done = False
+    return env.score, env.level, info.get('ghosts', 0), int(info.get('game_won', False)), steps
+
+def _run_seeds(seeds):
+    env, agent = _worker
+    return [(run_episode(env, agent, seed), bytes(env.actions)) for seed in seeds]
+
+def mean_ci(values, z=1.96):
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < 2: return values.mean(), 0.0
+    return values.mean(), z * values.std(ddof=1) / np.sqrt(len(values))
+
+def median_ci(values, resamples=1000, seed=0):
+    # Intervalle à 95% par bootstrap (graine fixe pour des rapports reproductibles)
+    values = np.asarray(values, dtype=np.float64)
+    samples = np.random.default_rng(seed).choice(values, size=(resamples, len(values)))
+    low, high = np.percentile(np.median(samples, axis=1), [2.5, 97.5])
+    return np.median(values), low, high
+
+def wilson_ci(successes, n, z=1.96):
+    if n == 0: return 0.0, 0.0, 0.0
+    p = successes / n
+    center = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return p, center - half, center + half
+
+def summarize(results, elapsed):
+    score, level, ghosts, won, steps = (results[:, i] for i in range(len(EVAL_COLUMNS)))
+    n = len(results)
+    summary = {"episodes": n, "elapsed": elapsed, "steps_per_sec": steps.sum() / elapsed if elapsed > 0 else 0.0}
+    summary["score_mean"], summary["score_ci"] = mean_ci(score)
+    summary["score_median"], summary["score_median_low"], summary["score_median_high"] = median_ci(score)
+    summary["level_mean"], summary["level_ci"] = mean_ci(level)
+    summary["ghosts_mean"], summary["ghosts_ci"] = mean_ci(ghosts)
+    summary["win_rate"], summary["win_low"], summary["win_high"] = wilson_ci(int(won.sum()), n)
+    return summary
+
+def print_summary(s):
+    print(f"Évaluation gloutonne : {s['episodes']} épisodes en {s['elapsed']:.1f}s ({s['steps_per_sec']:.0f} pas/s)")
+    print(f"  Score moyen   : {s['score_mean']:.1f} ± {s['score_ci']:.1f}")
+    print(f"  Score médian  : {s['score_median']:.0f} [{s['score_median_low']:.0f}, {s['score_median_high']:.0f}]")
+    print(f"  Niveau        : {s['level_mean']:.2f} ± {s['level_ci']:.2f}")
+    print(f"  Fantômes      : {s['ghosts_mean']:.2f} ± {s['ghosts_ci']:.2f}")
+    print(f"  Victoires     : {100 * s['win_rate']:.1f}% [{100 * s['win_low']:.1f}, {100 * s['win_high']:.1f}]")
+
+def evaluate(episodes, workers=1, seed=0, filename=MODEL_FILE, record=None, game_map=None):
+    # Les épisodes i utilisent la graine seed + i : mêmes parties quel que soit le nombre de workers
+    seeds = [seed + i for i in range(episodes)]
+    game_map = game_map or load_map()
+    start = time.perf_counter()
+    if workers > 1:
+        chunks = [seeds[i::workers] for i in range(workers)]
+        with mp.Pool(workers, initializer=_init_worker, initargs=(filename, game_map)) as pool:
+            parts = pool.map(_run_seeds, chunks)
+        # Remise dans l'ordre des graines
+        rows = [None] * episodes
+        for i, part in enumerate(parts):
+            rows[i::workers] = part
+    else:
+        _init_worker(filename, game_map)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        rows = _run_seeds(seeds)
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(np.array([stats for stats, _ in rows], dtype=np.float64), elapsed)
+    print_summary(summary)
+    if record:
+        save_recordings(record, [{"seed": s, "actions": actions, "score": stats[0], "map": game_map.name, "distance": DISTANCE} for s, (stats, actions) in zip(seeds, rows)])
+        print(f"Épisodes enregistrés dans {record}")
+    return summary
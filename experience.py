@@ -0,0 +1,62 @@
+import numpy as np
+from config import *
+
+class ReplayBuffer:
+    # Mémoire d'expérience circulaire dans des tableaux NumPy préalloués (états encodés par encode_state).
+    # Tirage uniforme, ou proportionnel à |erreur TD| ** PRIORITY_ALPHA si prioritized=True
+    # (les nouvelles transitions reçoivent la plus forte priorité connue pour être rejouées au moins une fois).
+    def __init__(self, capacity=EXPERIENCE_SIZE, prioritized=EXPERIENCE_PRIORITIZED, seed=None,
+                 alpha=PRIORITY_ALPHA, beta=PRIORITY_BETA):
+        self.capacity = capacity
+        self.states = np.zeros(capacity, dtype=np.int32)
+        self.actions = np.zeros(capacity, dtype=np.int8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(capacity, dtype=np.int32)
+        self.next_actions = np.zeros(capacity, dtype=np.int8)  # -1 : fin d'épisode
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.priorities = np.zeros(capacity, dtype=np.float64) if prioritized else None
+        self.max_priority = 1.0
+        self.alpha = alpha
+        self.beta = beta
+        self.rng = np.random.default_rng(seed)
+        self.pos = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, next_action):
+        i = self.pos
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = next_action is None
+        self.next_actions[i] = -1 if next_action is None else next_action
+        if self.priorities is not None: self.priorities[i] = self.max_priority
+        self.pos = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size):
+        # -> (indices, (états, actions, récompenses, états suivants, actions suivantes, fins), poids)
+        if self.priorities is None:
+            indices = self.rng.integers(0, self.size, batch_size)
+            weights = np.ones(batch_size)
+        else:
+            # Tirage par somme cumulée : O(taille) par lot, un seul passage NumPy
+            cumulative = np.cumsum(self.priorities[:self.size])
+            total = cumulative[-1]
+            indices = np.minimum(np.searchsorted(cumulative, self.rng.random(batch_size) * total, side='right'),
+                                 self.size - 1)
+            # Poids d'importance pour compenser le biais du tirage, normalisés par le plus grand
+            weights = (self.size * self.priorities[indices] / total) ** -self.beta
+            weights /= weights.max()
+        batch = (self.states[indices], self.actions[indices], self.rewards[indices],
+                 self.next_states[indices], self.next_actions[indices], self.dones[indices])
+        return indices, batch, weights
+
+    def update_priorities(self, indices, deltas):
+        if self.priorities is None: return
+        priorities = (np.abs(deltas) + PRIORITY_EPS) ** self.alpha
+        self.priorities[indices] = priorities
+        self.max_priority = max(self.max_priority, float(priorities.max()))
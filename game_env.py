@@ -1,13 +1,64 @@
 import numpy as np
-import random
+from rng import RandomStream
 from config import *
+from maze import compile_maze
+from maps import load_map
+
+# Encodage dense de l'état : chaque direction vaut mur x fantôme x nourriture = 2 x 3 x 2 = 12 valeurs,
+# puis any_scared (2) et last_action (5) -> 12^4 x 2 x 5 = 207 360 états
+RADAR_VALUES = 12
+NUM_STATES = RADAR_VALUES ** 4 * 2 * 5
+
+# Récompenses par défaut (config.py), remplaçables par environnement (voir sweep.py)
+REWARDS = {"R_STEP": R_STEP, "R_WALL": R_WALL, "R_DOT": R_DOT, "R_POWER": R_POWER, "R_GHOST_EAT": R_GHOST_EAT,
+           "R_DEATH": R_DEATH, "R_WIN": R_WIN, "R_GAME_WIN": R_GAME_WIN}
+
+def encode_state(state):
+    (w0, g0, f0), (w1, g1, f1), (w2, g2, f2), (w3, g3, f3), any_scared, last_action = state
+    index = (w0 * 6 + g0 * 2 + f0) * RADAR_VALUES + w1 * 6 + g1 * 2 + f1
+    index = (index * RADAR_VALUES + w2 * 6 + g2 * 2 + f2) * RADAR_VALUES + w3 * 6 + g3 * 2 + f3
+    return (index * 2 + any_scared) * 5 + last_action
+
+def decode_state(index):
+    index = int(index)
+    last_action = index % 5
+    index //= 5
+    any_scared = index % 2
+    index //= 2
+    radar = []
+    for _ in range(4):
+        value = index % RADAR_VALUES
+        index //= RADAR_VALUES
+        radar.append((value // 6, value % 6 // 2, value % 2))
+    return tuple(radar[::-1] + [any_scared, last_action])
+
+def encode_states(states):
+    # Version vectorisée pour les tableaux (N, 14) de VecPacmanEnv.get_states
+    states = np.asarray(states, dtype=np.int64)
+    radar = states[:, 0:12:3] * 6 + states[:, 1:12:3] * 2 + states[:, 2:12:3]
+    index = ((radar[:, 0] * RADAR_VALUES + radar[:, 1]) * RADAR_VALUES + radar[:, 2]) * RADAR_VALUES + radar[:, 3]
+    return (index * 2 + states[:, 12]) * 5 + states[:, 13]
 
 class PacmanEnv:
-    def __init__(self):
-        self.grid_shape = (len(GAME_MAP), len(GAME_MAP[0]))
+    def __init__(self, game_map=None, seed=None, distance=DISTANCE, rewards=None):
+        self.game_map = game_map or load_map()
+        unknown = set(rewards or {}) - set(REWARDS)
+        if unknown: raise ValueError(f"Récompenses inconnues : {sorted(unknown)}")
+        self.rewards = {**REWARDS, **(rewards or {})}
+        self.grid_shape = self.game_map.shape
+        self.maze = compile_maze(self.game_map.grid)
+        self.distance = distance
+        self.maze_distance = distance == "MAZE"
+        self.pellet_order = self.maze.maze_pellet_order if self.maze_distance else self.maze.pellet_order
+        self.seeds = np.random.default_rng(seed)  # graines des épisodes successifs
+        self.random = RandomStream()
         self.reset()
 
-    def reset(self):
+    def reset(self, seed=None):
+        # Chaque épisode a sa propre graine : (seed, actions) suffit à le rejouer (voir replay.py)
+        self.seed = int(self.seeds.integers(2**63)) if seed is None else seed
+        self.random.seed(self.seed)
+        self.actions = bytearray()
         self.level = 1
         self.score = 0
         self.lives = INITIAL_LIVES
@@ -20,11 +71,15 @@ class PacmanEnv:
         return self._start_level()
 
     def _start_level(self):
-        self.grid = [row[:] for row in GAME_MAP]
+        self.grid = [row[:] for row in self.game_map.grid]
         self.done = False
         self.steps = 0
         self.max_steps = 2000 
         self.total_dots = sum(row.count(DOT) + row.count(POWER) for row in self.grid)
+        self.eaten = [] # pastilles mangées pendant le niveau, dans l'ordre (utilisé par le rendu)
+        # Curseur par case dans pellet_order : les pastilles ne font que disparaître pendant un niveau,
+        # le curseur avance donc de façon monotone
+        self.pellet_ptr = [[0] * self.grid_shape[1] for _ in range(self.grid_shape[0])]
         self._reset_positions()
         self.last_action = 4
         
@@ -36,39 +91,44 @@ class PacmanEnv:
         return self.get_state()
 
     def _reset_positions(self):
-        self.pacman_pos = (5, 5) 
+        self.pacman_pos = self.game_map.pacman_start
         
         self.ghosts = [
-            {'pos': (3, 5), 'start': (3, 5), 'scared': 0, 'color': GHOST_COLORS[0]}, 
-            {'pos': (5, 7), 'start': (5, 7), 'scared': 0, 'color': GHOST_COLORS[1]}
+            {'pos': start, 'start': start, 'scared': 0, 'color': GHOST_COLORS[i % len(GHOST_COLORS)]}
+            for i, start in enumerate(self.game_map.ghost_starts)
         ]
 
     def step(self, action):
         if self.done: return self.get_state(), 0, True, {}
         
+        self.actions.append(action)
+        # 3 tirages par fantôme (déplacement, mode, case), comme VecPacmanEnv
+        rand = self.random.draw(3 * len(self.ghosts))
         self.steps += 1
-        reward = R_STEP 
+        rewards = self.rewards
+        reward = rewards["R_STEP"]
         info = {"level_cleared": False, "ghosts": self.ghosts_eaten, "game_won": False}
         
         r, c = self.pacman_pos
-        dr, dc = {UP: (-1,0), DOWN: (1,0), LEFT: (0,-1), RIGHT: (0,1)}[action]
-        nr, nc = r + dr, c + dc
+        next_pos = self.maze.next_cell[r][c][action]
         
-        if not (0 <= nr < self.grid_shape[0] and 0 <= nc < self.grid_shape[1]) or self.grid[nr][nc] == WALL:
-            reward += R_WALL 
+        if next_pos is None:
+            reward += rewards["R_WALL"] 
         else:
-            self.pacman_pos = (nr, nc)
+            self.pacman_pos = next_pos
             self.last_action = action
         
         cell = self.grid[self.pacman_pos[0]][self.pacman_pos[1]]
         if cell == DOT:
-            reward += R_DOT
+            reward += rewards["R_DOT"]
             self.grid[self.pacman_pos[0]][self.pacman_pos[1]] = EMPTY
+            self.eaten.append(self.pacman_pos)
             self.total_dots -= 1
             self.score += 10
         elif cell == POWER:
-            reward += R_POWER
+            reward += rewards["R_POWER"]
             self.grid[self.pacman_pos[0]][self.pacman_pos[1]] = EMPTY
+            self.eaten.append(self.pacman_pos)
             self.total_dots -= 1
             self.score += 50
             for g in self.ghosts: g['scared'] = self.power_duration 
@@ -77,38 +137,44 @@ class PacmanEnv:
             if self.level >= MAX_LEVEL:
                 self.done = True
                 info["game_won"] = True
-                return self.get_state(), R_GAME_WIN, True, info
+                return self.get_state(), rewards["R_GAME_WIN"], True, info
             else:
                 self.done = True
                 info["level_cleared"] = True
-                return self.get_state(), R_WIN, True, info
+                return self.get_state(), rewards["R_WIN"], True, info
 
-        for g in self.ghosts:
+        if self.maze_distance:
+            field = self.maze.distance_field(self.pacman_pos)
+            dist = lambda p: field[p[0]][p[1]]
+        else:
+            pac_r, pac_c = self.pacman_pos
+            dist = lambda p: abs(p[0] - pac_r) + abs(p[1] - pac_c)
+
+        for i, g in enumerate(self.ghosts):
+            r_move, r_mode, r_pick = rand[3 * i:3 * i + 3]
             if g['scared'] > 0: g['scared'] -= 1
             
-            should_move = True if g['scared'] > 0 else (random.random() < self.ghost_move_prob)
+            should_move = True if g['scared'] > 0 else (r_move < self.ghost_move_prob)
             
             if should_move:
-                moves = []
                 gr, gc = g['pos']
-                for m_dr, m_dc in [(0,1), (0,-1), (1,0), (-1,0)]:
-                    if self.grid[gr+m_dr][gc+m_dc] != WALL: moves.append((gr+m_dr, gc+m_dc))
+                moves = self.maze.ghost_moves[gr][gc]
                 
                 if moves:
                     if g['scared'] > 0:
-                        if random.random() < 0.2: 
-                            g['pos'] = random.choice(moves)
+                        if r_mode < 0.2: 
+                            g['pos'] = moves[int(r_pick * len(moves))]
                         else:
-                            g['pos'] = max(moves, key=lambda p: abs(p[0]-self.pacman_pos[0]) + abs(p[1]-self.pacman_pos[1]))
+                            g['pos'] = max(moves, key=dist)
                     else:
-                        if random.random() < 0.3: 
-                            g['pos'] = min(moves, key=lambda p: abs(p[0]-self.pacman_pos[0]) + abs(p[1]-self.pacman_pos[1]))
+                        if r_mode < 0.3: 
+                            g['pos'] = min(moves, key=dist)
                         else:
-                            g['pos'] = random.choice(moves)
+                            g['pos'] = moves[int(r_pick * len(moves))]
 
             if g['pos'] == self.pacman_pos:
                 if g['scared'] > 0:
-                    reward += R_GHOST_EAT
+                    reward += rewards["R_GHOST_EAT"]
                     self.score += 200
                     self.ghosts_eaten += 1
                     g['pos'] = g['start']
@@ -116,9 +182,9 @@ class PacmanEnv:
                 else:
                     self.lives -= 1
                     if self.lives == 0:
-                        return self.get_state(), R_DEATH, True, {"result": "die", "ghosts": self.ghosts_eaten}
+                        return self.get_state(), rewards["R_DEATH"], True, {"result": "die", "ghosts": self.ghosts_eaten}
                     else:
-                        reward += R_DEATH / 4 
+                        reward += rewards["R_DEATH"] / 4 
                         self._reset_positions()
                         self.last_action = 4 
                         return self.get_state(), reward, False, {"result": "hit", "ghosts": self.ghosts_eaten}
@@ -127,42 +193,53 @@ class PacmanEnv:
         
         return self.get_state(), reward, self.done, info
 
+    def _nearest_pellet(self):
+        r, c = self.pacman_pos
+        order = self.pellet_order[r][c]
+        if order is None: order = self.maze.sort_pellets(r, c, self.maze_distance)
+        i = self.pellet_ptr[r][c]
+        while i < len(order) and self.grid[order[i][0]][order[i][1]] not in [DOT, POWER]:
+            i += 1
+        self.pellet_ptr[r][c] = i
+        return order[i] if i < len(order) else None
+
     def get_state(self):
         head_r, head_c = self.pacman_pos
         deltas = [(-1, 0), (1, 0), (0, -1), (0, 1)]
         radar = []
 
-        nearest_dist = float('inf')
-        target = None
-        for r in range(self.grid_shape[0]):
-            for c in range(self.grid_shape[1]):
-                if self.grid[r][c] in [DOT, POWER]:
-                    dist = abs(r - head_r) + abs(c - head_c)
-                    if dist < nearest_dist:
-                        nearest_dist = dist
-                        target = (r, c)
-
-        for delta_row, delta_col in deltas:
-            next_r, next_c = head_r + delta_row, head_c + delta_col
-            is_wall = 0
-            if not (0 <= next_r < self.grid_shape[0] and 0 <= next_c < self.grid_shape[1]) or self.grid[next_r][next_c] == WALL:
-                is_wall = 1
+        target = self._nearest_pellet()
+        if target and self.maze_distance:
+            # Direction de la nourriture : cases voisines plus proches de la cible en distance réelle
+            field = self.maze.distance_field(target)
+            closer = [nxt is not None and field[nxt[0]][nxt[1]] < field[head_r][head_c]
+                      for nxt in self.maze.next_cell[head_r][head_c]]
+        wall_mask = self.maze.wall_mask[head_r][head_c]
+        rays = self.maze.rays[head_r][head_c]
+
+        # Premier fantôme de la liste sur chaque case -> effrayé ou non
+        ghost_at = {}
+        for g in self.ghosts:
+            ghost_at.setdefault(g['pos'], g['scared'] > 0)
+
+        for a, (delta_row, delta_col) in enumerate(deltas):
+            is_wall = (wall_mask >> a) & 1
             
             ghost_status = 0 
-            for i in range(1, 8): # regarder jusqu'a 7 cellules devant
-                r, c = head_r + (delta_row*i), head_c + (delta_col*i)
-                for g in self.ghosts:
-                    if g['pos'] == (r, c):
-                        if g['scared'] > 0: 
-                            ghost_status = 2 
-                        else:
-                            if i <= 2 and ghost_status != 1: ghost_status = 1 
-                        break 
-                if ghost_status == 1: break 
+            for i, cell in enumerate(rays[a], 1): # regarder jusqu'a 7 cellules devant
+                scared = ghost_at.get(cell)
+                if scared is None: continue
+                if scared:
+                    ghost_status = 2
+                elif i <= 2:
+                    ghost_status = 1
+                    break
             
             food_dir = 0
             
-            if target:
+            if target and self.maze_distance:
+                food_dir = int(closer[a])
+            elif target:
                 dist_current = abs(target[0] - head_r) + abs(target[1] - head_c)
                 dist_next = abs(target[0] - (head_r+delta_row)) + abs(target[1] - (head_c+delta_col))
                 if dist_next < dist_current:
@@ -1,8 +1,8 @@
 import pygame
 import math
-import matplotlib.pyplot as plt
-import numpy as np
+import time
 from config import *
+from metrics import RollingMean
 
 class GameRenderer:
     def __init__(self, env):
@@ -17,31 +17,86 @@ class GameRenderer:
         pygame.display.set_caption("Pac-Man")
         
         self.clock = pygame.time.Clock()
+        self.fps = FPS            # 0 = pas de limite (benchmarks)
         self.font = pygame.font.SysFont("Arial", 16, bold=True)
         self.title_font = pygame.font.SysFont("Arial", 30, bold=True)
         
         self.anim_timer = 0
+        
+        self.grid = None          # grille du niveau dont les couches sont en cache
+        self.sprite_rects = []    # cases occupées par les sprites à la frame précédente
+        self.power_visible = None
+        self.hud_text = {}
+        self.hud_values = None
+        self.full_redraw = True
+        self.frame_time = RollingMean(60)
+        self.frame_time_label = 0.0
 
     def render_game(self, info_dict={}):
         self.render(info_dict)
 
-    def render(self, info_dict={}):
-        self.screen.fill(NAVY)
-        self.anim_timer += 1
+    def _tile_rect(self, pos):
+        return pygame.Rect(pos[1] * TILE_SIZE, pos[0] * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+
+    def _build_level_layers(self):
+        # Murs pré-rendus une fois par niveau, pastilles sur une couche à part mise à jour à chaque pastille mangée
+        self.grid = self.env.grid
+        self.eaten_seen = len(self.env.eaten)
+        self.background = pygame.Surface((self.map_w, self.map_h))
+        self.background.fill(NAVY)
+        self.power_cells = []
+        
+        for r in range(self.env.grid_shape[0]):
+            for c in range(self.env.grid_shape[1]):
+                if self.grid[r][c] == WALL:
+                    x, y = c * TILE_SIZE, r * TILE_SIZE
+                    pygame.draw.rect(self.background, WALL_COLOR, (x+2, y+2, TILE_SIZE-4, TILE_SIZE-4), border_radius=4)
         
+        self.pellets = self.background.copy()
         for r in range(self.env.grid_shape[0]):
             for c in range(self.env.grid_shape[1]):
-                x, y = c * TILE_SIZE, r * TILE_SIZE
-                cell = self.env.grid[r][c]
-                
-                if cell == WALL:
-                    rect = (x+2, y+2, TILE_SIZE-4, TILE_SIZE-4)
-                    pygame.draw.rect(self.screen, WALL_COLOR, rect, border_radius=4)
-                elif cell == DOT:
-                    pygame.draw.circle(self.screen, DOT_COLOR, (x + TILE_SIZE//2, y + TILE_SIZE//2), 3)
-                elif cell == POWER:
-                    if (self.anim_timer // 10) % 2 == 0:
-                        pygame.draw.circle(self.screen, DOT_COLOR, (x + TILE_SIZE//2, y + TILE_SIZE//2), 7)
+                center = (c * TILE_SIZE + TILE_SIZE//2, r * TILE_SIZE + TILE_SIZE//2)
+                if self.grid[r][c] == DOT:
+                    pygame.draw.circle(self.pellets, DOT_COLOR, center, 3)
+                elif self.grid[r][c] == POWER:
+                    # Les super-pastilles clignotent : dessinées directement à l'écran
+                    self.power_cells.append((r, c))
+
+    def _restore(self, rect):
+        self.screen.blit(self.pellets, rect, rect)
+
+    def render(self, info_dict={}):
+        start = time.perf_counter()
+        self.anim_timer += 1
+        dirty = []
+        
+        if self.env.grid is not self.grid:
+            self._build_level_layers()
+            self.full_redraw = True
+        
+        for pos in self.env.eaten[self.eaten_seen:]:
+            rect = self._tile_rect(pos)
+            self.pellets.blit(self.background, rect, rect)
+            if pos in self.power_cells: self.power_cells.remove(pos)
+            dirty.append(rect)
+        self.eaten_seen = len(self.env.eaten)
+        
+        if self.full_redraw:
+            self.screen.blit(self.pellets, (0, 0))
+        else:
+            dirty += self.sprite_rects
+            for rect in dirty: self._restore(rect)
+        
+        power_visible = (self.anim_timer // 10) % 2 == 0
+        power_toggled = power_visible != self.power_visible
+        self.power_visible = power_visible
+        for pos in self.power_cells:
+            rect = self._tile_rect(pos)
+            if self.full_redraw or power_toggled or rect.collidelist(dirty) != -1:
+                self._restore(rect)
+                if power_visible:
+                    pygame.draw.circle(self.screen, DOT_COLOR, rect.center, 7)
+                dirty.append(rect)
 
         pr, pc = self.env.pacman_pos
         px, py = pc * TILE_SIZE + TILE_SIZE//2, pr * TILE_SIZE + TILE_SIZE//2
@@ -53,6 +108,7 @@ class GameRenderer:
             (px + (TILE_SIZE//2)*math.cos(mouth_angle), py + (TILE_SIZE//2)*math.sin(mouth_angle)),
             (px + (TILE_SIZE//2)*math.cos(-mouth_angle), py + (TILE_SIZE//2)*math.sin(-mouth_angle))
         ])
+        self.sprite_rects = [self._tile_rect(self.env.pacman_pos)]
 
         for i, g in enumerate(self.env.ghosts):
             gr, gc = g['pos']
@@ -61,35 +117,55 @@ class GameRenderer:
             
             color = SCARED_COLOR if g['scared'] > 0 else g['color']
             
-            rect_top = (gx, gy, g_size, g_size//2)
-            rect_bot = (gx, gy + g_size//2, g_size, g_size//2)
             pygame.draw.ellipse(self.screen, color, (gx, gy, g_size, g_size)) 
             pygame.draw.rect(self.screen, color, (gx, gy + g_size//2, g_size, g_size//2)) 
             
             pygame.draw.circle(self.screen, WHITE, (gx + g_size//3, gy + g_size//3), 3)
             pygame.draw.circle(self.screen, WHITE, (gx + 2*g_size//3, gy + g_size//3), 3)
+            self.sprite_rects.append(self._tile_rect(g['pos']))
+        dirty += self.sprite_rects
+
+        if self.anim_timer % 30 == 0:
+            self.frame_time_label = self.frame_time.mean
+        hud_values = (self.env.score, self.env.lives, self.env.level,
+                      info_dict.get('episode', 0), f"{info_dict.get('epsilon', 0):.2f}", f"{self.frame_time_label:.2f}")
+        if self.full_redraw or hud_values != self.hud_values:
+            self.hud_values = hud_values
+            dirty.append(self._draw_hud(hud_values))
+
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(dirty)
+        self.frame_time.add((time.perf_counter() - start) * 1000)
+        self.clock.tick(self.fps)
 
-        pygame.draw.rect(self.screen, BLACK, (0, self.height - 60, self.width, 60))
+    def _hud_surface(self, slot, text, color):
+        # Texte re-rendu uniquement quand sa valeur change
+        cached = self.hud_text.get(slot)
+        if cached is None or cached[0] != text:
+            cached = (text, self.font.render(text, True, color))
+            self.hud_text[slot] = cached
+        return cached[1]
+
+    def _draw_hud(self, hud_values):
+        score, lives, level, episode, epsilon, frame_ms = hud_values
+        hud_rect = pygame.Rect(0, self.height - 60, self.width, 60)
+        pygame.draw.rect(self.screen, BLACK, hud_rect)
         pygame.draw.line(self.screen, WHITE, (0, self.height - 60), (self.width, self.height - 60), 2)
         
-        score_txt = self.font.render(f"SCORE: {self.env.score}", True, WHITE)
-        lives_txt = self.font.render(f"LIVES: {self.env.lives}", True, WHITE)
-        level_txt = self.font.render(f"LEVEL: {self.env.level}", True, ORANGE)
-        
-        ep_txt = self.font.render(f"EP: {info_dict.get('episode', 0)}", True, YELLOW)
-        eps_txt = self.font.render(f"EPS: {info_dict.get('epsilon', 0):.2f}", True, CYAN)
-        
-        self.screen.blit(score_txt, (10, self.height - 50))
-        self.screen.blit(lives_txt, (120, self.height - 50))
-        self.screen.blit(level_txt, (220, self.height - 50))
+        self.screen.blit(self._hud_surface('score', f"SCORE: {score}", WHITE), (10, self.height - 50))
+        self.screen.blit(self._hud_surface('lives', f"LIVES: {lives}", WHITE), (120, self.height - 50))
+        self.screen.blit(self._hud_surface('level', f"LEVEL: {level}", ORANGE), (220, self.height - 50))
         
-        self.screen.blit(ep_txt, (10, self.height - 25))
-        self.screen.blit(eps_txt, (120, self.height - 25))
-
-        pygame.display.flip()
-        self.clock.tick(FPS)
+        self.screen.blit(self._hud_surface('episode', f"EP: {episode}", YELLOW), (10, self.height - 25))
+        self.screen.blit(self._hud_surface('epsilon', f"EPS: {epsilon}", CYAN), (120, self.height - 25))
+        self.screen.blit(self._hud_surface('frame', f"FRAME: {frame_ms}ms", WHITE), (220, self.height - 25))
+        return hud_rect
 
     def render_menu(self, selected_idx, options):
+        self.full_redraw = True
         self.screen.fill(BLACK)
         title = self.title_font.render("MODELE PAC-MAN", True, YELLOW)
         self.screen.blit(title, (self.width//2 - title.get_width()//2, 50))
@@ -103,106 +179,3 @@ class GameRenderer:
         
     def close(self):
         pygame.quit()
-
-class TrainingChart:
-    def __init__(self, visual=True):
-        self.visual = visual
-        
-        if self.visual:
-            plt.ion()
-            self.fig, (self.ax1, self.ax2, self.ax3) = plt.subplots(3, 1, figsize=(8, 10), sharex=True)
-            self.fig.canvas.manager.set_window_title("Metrics")
-        else:
-            self.fig, (self.ax1, self.ax2, self.ax3) = plt.subplots(3, 1, figsize=(8, 10), sharex=True)
-        
-        self.episodes = []
-        self.scores = []
-        self.epsilons = []
-        self.ghosts_eaten = []
-        
-        self.avg_scores = []
-        self.avg_ghosts = []
-        self.avg_levels = []
-        self.max_levels = []
-        
-    def update(self, episode, score, epsilon, ghosts_eaten, level):
-        self.episodes.append(episode)
-        self.scores.append(score)
-        self.epsilons.append(epsilon)
-        self.ghosts_eaten.append(ghosts_eaten)
-        self.max_levels.append(level)
-        
-        self.avg_scores.append(np.mean(self.scores[-50:]))
-        self.avg_ghosts.append(np.mean(self.ghosts_eaten[-50:]))
-        self.avg_levels.append(np.mean(self.max_levels[-50:]))
-        
-        if self.visual and episode % 10 == 0:
-            self._draw()
-            plt.pause(0.001)
-            
-    def _draw(self):
-        self.ax1.clear()
-        l1 = self.ax1.plot(self.episodes, self.scores, color='lightgray', alpha=0.5, label='Raw Score')
-        l2 = self.ax1.plot(self.episodes, self.avg_scores, color='blue', linewidth=2, label='Avg Score')
-        self.ax1.set_ylabel('Score')
-        self.ax1.legend(loc='upper left')
-        
-        for ax in self.ax1.figure.axes:
-            if ax is not self.ax1 and ax is not self.ax2 and ax is not self.ax3:
-                ax.remove()
-                
-        ax1_twin = self.ax1.twinx()
-        l3 = ax1_twin.plot(self.episodes, self.epsilons, color='orange', linestyle='--', label='Epsilon', alpha=0.7)
-        ax1_twin.set_ylabel('Epsilon', color='orange')
-        ax1_twin.set_ylim(0, 1.1)
-        
-        self.ax2.clear()
-        self.ax2.plot(self.episodes, self.ghosts_eaten, color='lightgray', alpha=0.5)
-        self.ax2.plot(self.episodes, self.avg_ghosts, color='red', linewidth=2, label='Avg Ghosts')
-        self.ax2.set_ylabel('Ghosts Eaten')
-        self.ax2.legend(loc='upper left')
-        
-        self.ax3.clear()
-        self.ax3.plot(self.episodes, self.max_levels, color='lightgray', alpha=0.5)
-        self.ax3.plot(self.episodes, self.avg_levels, color='green', linewidth=2, label='Avg Level')
-        self.ax3.set_ylabel('Max Level')
-        self.ax3.set_xlabel('Episode')
-        self.ax3.legend(loc='upper left')
-        
-        plt.tight_layout()
-    
-    def save_plot(self, filename="models/training_plot.png"):
-        if not self.episodes: return
-        
-        if not self.visual:
-            fig, axs = plt.subplots(3, 1, figsize=(8, 10), sharex=True)
-            fig.suptitle('Entraînement Pac-Man')
-            
-            ax1 = axs[0]
-            ax1.plot(self.episodes, self.scores, color='lightgray', alpha=0.5, label='Raw Score')
-            ax1.plot(self.episodes, self.avg_scores, color='blue', label='Avg Score')
-            ax1.set_ylabel('Score')
-            ax1.legend(loc='upper left')
-            
-            ax2 = ax1.twinx()
-            ax2.plot(self.episodes, self.epsilons, color='orange', linestyle='--', alpha=0.7, label='Epsilon')
-            ax2.set_ylabel('Epsilon', color='orange')
-            
-            axs[1].plot(self.episodes, self.ghosts_eaten, color='lightgray', alpha=0.5)
-            axs[1].plot(self.episodes, self.avg_ghosts, color='red', label='Avg Ghosts')
-            axs[1].set_ylabel('Ghosts Eaten')
-            axs[1].legend(loc='upper left')
-            
-            axs[2].plot(self.episodes, self.max_levels, color='lightgray', alpha=0.5)
-            axs[2].plot(self.episodes, self.avg_levels, color='green', label='Avg Level')
-            axs[2].set_ylabel('Max Level')
-            axs[2].set_xlabel('Episode')
-            axs[2].legend(loc='upper left')
-            
-            fig.savefig(filename)
-            plt.close(fig)
-        else:
-            self.fig.savefig(filename)
-            
-    def close(self):
-        plt.close()
@@ -0,0 +1,179 @@
+import os
+import signal
+import traceback
+import multiprocessing as mp
+import numpy as np
+import gymnasium as gym
+from gymnasium import spaces
+from gymnasium.vector import VectorEnv, AutoresetMode
+from gymnasium.vector.utils import batch_space
+from config import *
+from game_env import PacmanEnv, NUM_STATES, encode_state
+
+# Interface Gymnasium de PacmanEnv (dépendance optionnelle : pip install gymnasium).
+# Observation = état encodé (encode_state, Discrete(NUM_STATES)), action = direction (Discrete(4)).
+# Les passages de niveau sont gérés ici : l'épisode est la partie complète, comme dans main.train.
+
+INFO_KEYS = ["score", "level", "lives", "ghosts"]
+
+class PacmanGymEnv(gym.Env):
+    metadata = {"render_modes": []}
+
+    def __init__(self, game_map=None, distance=DISTANCE, rewards=None):
+        self.env = PacmanEnv(game_map, distance=distance, rewards=rewards)
+        self.observation_space = spaces.Discrete(NUM_STATES)
+        self.action_space = spaces.Discrete(len(ACTIONS))
+
+    def _info(self):
+        env = self.env
+        return {"score": env.score, "level": env.level, "lives": env.lives, "ghosts": env.ghosts_eaten, "seed": env.seed}
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+        # Une graine donnée fixe la suite des graines d'épisodes ; sans graine, la suite continue.
+        # info["seed"] + les actions suffisent à rejouer l'épisode (voir replay.py)
+        if seed is not None: self.env.seeds = np.random.default_rng(seed)
+        state = self.env.reset()
+        return encode_state(state), self._info()
+
+    def step(self, action):
+        env = self.env
+        state, reward, done, info = env.step(int(action))
+        if info.get("level_cleared", False):
+            state = env.next_level()
+            done = False
+        # Limite de pas d'un niveau atteinte sans mort ni victoire : tronqué, pas terminé
+        truncated = done and "result" not in info and not info.get("game_won", False)
+        return encode_state(state), float(reward), done and not truncated, truncated, self._info()
+
+gym.register(id="PacmanAR-v0", entry_point="gym_env:PacmanGymEnv")
+
+def _run_worker(pipe, indices, game_map, distance, rewards, buffers):
+    # Un processus fait avancer plusieurs parties (indices) l'une après l'autre ; actions lues et résultats
+    # écrits dans les tableaux partagés, le tube ne transporte que les commandes et les erreurs
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    obs, final_obs, rewards_buf, terminated, truncated, stats, actions = _attach(buffers)
+    envs = {i: PacmanGymEnv(game_map, distance, rewards) for i in indices}
+    try:
+        while True:
+            command, data = pipe.recv()
+            if command == "reset":
+                for i, env in envs.items():
+                    obs[i], _ = env.reset(seed=data[i])
+                pipe.send((True, None))
+            elif command == "step":
+                for i, env in envs.items():
+                    ob, rewards_buf[i], terminated[i], truncated[i], info = env.step(actions[i])
+                    stats[i] = [info[k] for k in INFO_KEYS]
+                    if terminated[i] or truncated[i]:
+                        # Remise à zéro dans le même pas (AutoresetMode.SAME_STEP)
+                        final_obs[i] = ob
+                        ob, _ = env.reset()
+                    obs[i] = ob
+                pipe.send((True, None))
+            elif command == "close":
+                pipe.send((True, None))
+                break
+    except Exception:
+        pipe.send((False, traceback.format_exc()))
+    finally:
+        pipe.close()
+
+def _create_buffers(num_envs):
+    return (mp.RawArray('q', num_envs), mp.RawArray('q', num_envs), mp.RawArray('d', num_envs),
+            mp.RawArray('b', num_envs), mp.RawArray('b', num_envs), mp.RawArray('q', num_envs * len(INFO_KEYS)),
+            mp.RawArray('q', num_envs))
+
+def _attach(buffers):
+    obs, final_obs, rewards, terminated, truncated, stats, actions = buffers
+    return (np.frombuffer(obs, dtype=np.int64), np.frombuffer(final_obs, dtype=np.int64),
+            np.frombuffer(rewards, dtype=np.float64), np.frombuffer(terminated, dtype=np.bool_),
+            np.frombuffer(truncated, dtype=np.bool_), np.frombuffer(stats, dtype=np.int64).reshape(-1, len(INFO_KEYS)),
+            np.frombuffer(actions, dtype=np.int64))
+
+class AsyncPacmanVecEnv(VectorEnv):
+    # num_envs parties réparties sur `workers` processus. Observations, récompenses et fins d'épisode passent
+    # par de la mémoire partagée (RawArray), pas par pickle. Les parties terminées repartent dans le même pas :
+    # infos["final_obs"] / infos["final_info"] décrivent l'épisode qui vient de finir (masques "_final_obs"...).
+    metadata = {"autoreset_mode": AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_envs, workers=None, game_map=None, distance=DISTANCE, rewards=None):
+        self.num_envs = num_envs
+        self.single_observation_space = spaces.Discrete(NUM_STATES)
+        self.single_action_space = spaces.Discrete(len(ACTIONS))
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        buffers = _create_buffers(num_envs)
+        (self._obs, self._final_obs, self._rewards, self._terminated, self._truncated,
+         self._stats, self._actions) = _attach(buffers)
+
+        workers = min(workers or os.cpu_count() or 1, num_envs)
+        self.pipes, self.processes = [], []
+        for indices in np.array_split(np.arange(num_envs), workers):
+            parent, child = mp.Pipe()
+            p = mp.Process(target=_run_worker, args=(child, indices.tolist(), game_map, distance, rewards, buffers),
+                           daemon=True)
+            p.start()
+            child.close()
+            self.pipes.append(parent)
+            self.processes.append(p)
+        self.waiting = False
+
+    def _send(self, command, data=None):
+        for pipe in self.pipes:
+            pipe.send((command, data))
+
+    def _wait(self):
+        errors = [message for ok, message in (pipe.recv() for pipe in self.pipes) if not ok]
+        if errors:
+            raise RuntimeError(f"Erreur dans un processus de AsyncPacmanVecEnv :\n{errors[0]}")
+
+    def reset(self, *, seed=None, options=None):
+        # seed entier -> seed + i pour la partie i ; ou une liste d'une graine (ou None) par partie
+        if isinstance(seed, list):
+            seeds = seed
+        else:
+            super().reset(seed=seed)
+            seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        if len(seeds) != self.num_envs:
+            raise ValueError(f"{len(seeds)} graines pour {self.num_envs} parties")
+        self._send("reset", seeds)
+        self._wait()
+        return self._obs.copy(), {}
+
+    def step_async(self, actions):
+        if self.waiting:
+            raise RuntimeError("step_async appelé deux fois sans step_wait")
+        self._actions[:] = actions
+        self._send("step")
+        self.waiting = True
+
+    def step_wait(self):
+        self.waiting = False
+        self._wait()
+        done = self._terminated | self._truncated
+        infos = {}
+        if done.any():
+            final_info = {k: self._stats[:, j].copy() for j, k in enumerate(INFO_KEYS)}
+            final_info.update({f"_{k}": done.copy() for k in INFO_KEYS})
+            infos = {"final_obs": self._final_obs.copy(), "_final_obs": done.copy(),
+                     "final_info": final_info, "_final_info": done.copy()}
+        return (self._obs.copy(), self._rewards.copy(), self._terminated.copy(), self._truncated.copy(), infos)
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close_extras(self, **kwargs):
+        if self.waiting:
+            self._wait()
+        for pipe, p in zip(self.pipes, self.processes):
+            if p.is_alive():
+                try:
+                    pipe.send(("close", None))
+                    pipe.recv()
+                except (OSError, EOFError):
+                    pass
+            p.join()
+            pipe.close()
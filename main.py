@@ -1,117 +1,184 @@
-import pygame
-import csv
 import argparse
 import time
 import sys
+import numpy as np
 from game_env import PacmanEnv
-from agent import QLearningAgent
-from graphics import GameRenderer, TrainingChart
+from maps import load_map
+from agent import QLearningAgent, DenseQTable
+from algorithms import ALGORITHMS
+from parallel import create_shared_table, attach_shared_table, start_workers
+from metrics import MetricsSink
+from checkpoint import Checkpointer, latest_checkpoint
+from chart import TrainingChart
+from render_process import RenderProcess
+from evaluate import evaluate
+from policy import TIE_BREAKS, freeze_model, load_player
+from profiler import Profiler
+from training import run_training_episode
+from replay import record, save_recordings, load_recordings, replay, replay_all
 from config import *
 
-if not os.path.exists(LOG_FILE) or os.path.getsize(LOG_FILE) == 0:
-    with open(LOG_FILE, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(["Episode", "Score", "Steps", "Epsilon", "GhostsEaten"])
-
-def train(episodes, visual=False, graphics=False, load=False):
-    env = PacmanEnv()
-    agent = QLearningAgent()
-
+def load_for_training(agent, load=False, resume=False):
     loaded_history = None
     start_episode = 0
     
-    if load:
-        loaded_history = agent.load_model()
+    filename = MODEL_FILE
+    if resume:
+        filename = latest_checkpoint()
+        if filename is None:
+            print("Aucun checkpoint valide trouvé, démarrage d'un nouvel entraînement.")
+    
+    if (load or resume) and filename:
+        loaded_history = agent.load_model(filename)
         if loaded_history:
             start_episode = loaded_history['episodes'][-1] + 1
             print(f"Reprise de l'entraînement à l'épisode {start_episode}")
+    return loaded_history, start_episode
 
+def train(episodes, visual=False, graphics=False, load=False, resume=False,
+          checkpoint_every=CHECKPOINT_EVERY, checkpoint_seconds=CHECKPOINT_SECONDS, async_visual=False,
+          profile=False, profile_out=None, profile_window=(0, 100), seed=None, game_map=None, algorithm=ALGORITHM):
+    env_seed, agent_seed = np.random.SeedSequence(seed).spawn(2)
+    env = PacmanEnv(game_map, seed=env_seed)
+    agent = QLearningAgent(seed=agent_seed, algorithm=algorithm)
+    if EXPERIENCE_SIZE: agent.enable_replay()
 
-    renderer = GameRenderer(env) if visual else None
+    loaded_history, start_episode = load_for_training(agent, load, resume)
+
+
+    renderer = None
+    if async_visual:
+        renderer = RenderProcess(env)
+    elif visual:
+        from graphics import GameRenderer
+        renderer = GameRenderer(env)
     chart = TrainingChart(visual=graphics) 
 
     if loaded_history:
-        chart.episodes = loaded_history.get('episodes', [])
-        chart.scores = loaded_history.get('scores', [])
-        chart.avg_scores = loaded_history.get('avg_scores', [])
-        chart.epsilons = loaded_history.get('epsilons', [])
-        
-        chart.ghosts_eaten = loaded_history.get('ghosts_eaten', []) 
-        chart.avg_ghosts = loaded_history.get('avg_ghosts', [])
-        
-        chart.max_levels = loaded_history.get('max_levels', []) 
-        chart.avg_levels = loaded_history.get('avg_levels', [])
+        chart.restore(loaded_history)
      
-    print(f"Démarrage de l'entraînement ({ALGORITHM}) pour {episodes} épisodes...")
+    # --checkpoint-every 0 --checkpoint-seconds 0 : pas de checkpoints (ni suivi des états modifiés, ni compactage)
+    checkpointer = Checkpointer(agent, chart, checkpoint_every, checkpoint_seconds) if checkpoint_every or checkpoint_seconds else None
+    print(f"Démarrage de l'entraînement ({agent.algorithm.name}) pour {episodes} épisodes...")
     
-    with open(LOG_FILE, 'a', newline='') as log_file:
-        log_writer = csv.writer(log_file)
-        
-        try:
-            for ep in range(start_episode, start_episode + episodes):
-                state = env.reset()
-                
-                action = agent.choose_action(state)
-                
-                done = False
-                total_reward = 0
-                
-                while not done:
-                    if visual and renderer:
-                        renderer.render(info_dict={'episode': ep, 'epsilon': agent.epsilon})
-                    
-                    next_state, reward, episode_done, info = env.step(action)
-                    
-                    if info.get("level_cleared", False):
-                        next_state = env.next_level()
-                        episode_done = False 
-                    
-                    next_action = agent.choose_action(next_state) if not episode_done else None
-                    
-                    agent.update(state, action, reward, next_state, next_action)
-                    
-                    state = next_state
-                    action = next_action
-                    total_reward += reward
-                    done = episode_done
-                    
-                agent.decay_epsilon()
-                
-                ghosts_count = info.get('ghosts', 0)
-                log_writer.writerow([ep, env.score, env.steps, agent.epsilon, ghosts_count])
-                
-                if chart:
-                    chart.update(ep, env.score, agent.epsilon, ghosts_count, env.level)
+    metrics = MetricsSink()
+
+    profiler = None
+    if profile:
+        profiler = Profiler(profile_out, profile_window)
+        for obj, method, name in [(env, "step", "env.step"), (env, "get_state", "env.get_state"),
+                                  (agent, "choose_action", "agent.choose_action"), (agent, "update", "agent.update"),
+                                  (metrics, "log", "metrics.log"), (chart, "update", "chart.update")]:
+            profiler.instrument(obj, method, name)
+        if checkpointer: profiler.instrument(checkpointer, "maybe_save", "checkpoint")
+        if renderer: profiler.instrument(renderer, "render", "renderer.render")
+        if agent.replay is not None: profiler.instrument(agent, "replay_update", "agent.replay_update")
+
+    best_episode = None
+    try:
+        for ep in range(start_episode, start_episode + episodes):
+            if profiler: profiler.begin_episode(ep - start_episode)
+            before_step = (lambda: renderer.render(info_dict={'episode': ep, 'epsilon': agent.epsilon})) if renderer else None
+            score, steps, ghosts_count = run_training_episode(env, agent, before_step)
+
+            metrics.log(ep, score, steps, agent.epsilon, ghosts_count)
+            if best_episode is None or score > best_episode["score"]:
+                best_episode = record(env)
+            
+            if chart:
+                chart.update(ep, score, agent.epsilon, ghosts_count, env.level)
+            
+            if ep % 100 == 0 or ep == 1:
+                print(f"Ep {ep}/{start_episode + episodes} | Score: {score} | Moy: {metrics.avg_score.mean:.1f} | Lvl: {env.level} | Eps: {agent.epsilon:.3f} | Alpha: {agent.alpha:.3f} | Taille Q-Table: {len(agent.q_table)} ({agent.memory_bytes() / 1024:.0f} Ko)")
+                if profiler: print(profiler.report())
+            if checkpointer: checkpointer.maybe_save(ep)
                 
-                if ep % 100 == 0 or ep == 1:
-                    print(f"Ep {ep}/{start_episode + episodes} | Score: {env.score} | Lvl: {env.level} | Eps: {agent.epsilon:.3f} | Alpha: {agent.alpha:.3f} | Taille Q-Table: {len(agent.q_table)}")
-                if ep % 500 == 0:
-                    pass 
-                    
-        except KeyboardInterrupt:
-            print("\nArrêt manuel détecté. Sauvegarde...")
-
-    history_data = {
-        'episodes': chart.episodes,
-        'scores': chart.scores,
-        'avg_scores': chart.avg_scores,
-        'epsilons': chart.epsilons,
-        'ghosts_eaten': chart.ghosts_eaten,
-        'avg_ghosts': chart.avg_ghosts,
-        'avg_levels': chart.avg_levels,
-        'max_levels': chart.max_levels
-    }
-    
-    agent.save_model(history=history_data)
+    except KeyboardInterrupt:
+        print("\nArrêt manuel détecté. Sauvegarde...")
+
+    if profiler: profiler.close()
+    if best_episode:
+        save_recordings(REPLAY_FILE, [best_episode])
+        print(f"Meilleur épisode (score {best_episode['score']}) enregistré dans {REPLAY_FILE}")
+    metrics.close()
+    if checkpointer: checkpointer.close()
+    agent.save_model(history=chart.history())
     if renderer: renderer.close()
     if chart: 
         chart.save_plot()
         chart.close()
 
-def play():
-    env = PacmanEnv()
-    agent = QLearningAgent()
-    agent.load_model()
+def train_parallel(episodes, workers, graphics=False, load=False, resume=False,
+                   checkpoint_every=CHECKPOINT_EVERY, checkpoint_seconds=CHECKPOINT_SECONDS, seed=None, game_map=None,
+                   algorithm=ALGORITHM):
+    agent = QLearningAgent(algorithm=algorithm)
+
+    loaded_history, start_episode = load_for_training(agent, load, resume)
+
+    chart = TrainingChart(visual=graphics) 
+    if loaded_history:
+        chart.restore(loaded_history)
+
+    # Q-Tables denses en mémoire partagée, mises à jour directement par tous les workers
+    tables = [create_shared_table(), create_shared_table()]
+    shared_tables = [attach_shared_table(t) for t in tables]
+    shared_tables[0].load(agent.q_table)
+    shared_tables[1].load(agent.q_table_2)
+
+    # Les workers ne peuvent pas suivre les états modifiés : copie complète des tables partagées
+    checkpoint_agent = QLearningAgent(backend="DENSE")
+    checkpoint_agent.q_table, checkpoint_agent.q_table_2 = shared_tables
+    checkpointer = Checkpointer(checkpoint_agent, chart, checkpoint_every, checkpoint_seconds,
+                                incremental=False) if checkpoint_every or checkpoint_seconds else None
+
+    print(f"Démarrage de l'entraînement ({agent.algorithm.name}) pour {episodes} épisodes sur {workers} workers...")
+    processes, stats_queue, stop_event = start_workers(workers, episodes, tables, agent.epsilon, agent.alpha, seed, game_map,
+                                                       agent.algorithm.name)
+    worker_params = {}
+    
+    metrics = MetricsSink()
+    ep = start_episode
+    finished = 0
+    while finished < workers:
+        try:
+            worker_id, stats = stats_queue.get()
+            if stats is None:
+                finished += 1
+                continue
+            
+            score, steps, epsilon, alpha, ghosts_count, level = stats
+            worker_params[worker_id] = (epsilon, alpha)
+            checkpoint_agent.epsilon, checkpoint_agent.alpha = epsilon, alpha
+            metrics.log(ep, score, steps, epsilon, ghosts_count)
+            chart.update(ep, score, epsilon, ghosts_count, level)
+            
+            if ep % 100 == 0 or ep == 1:
+                print(f"Ep {ep}/{start_episode + episodes} | Worker {worker_id} | Score: {score} | Moy: {metrics.avg_score.mean:.1f} | Lvl: {level} | Eps: {epsilon:.3f} | Alpha: {alpha:.3f} | Taille Q-Table: {len(shared_tables[0])} ({checkpoint_agent.memory_bytes() / 1024:.0f} Ko)")
+            if checkpointer: checkpointer.maybe_save(ep)
+            ep += 1
+        except KeyboardInterrupt:
+            print("\nArrêt manuel détecté. Arrêt des workers...")
+            stop_event.set()
+
+    for p in processes: p.join()
+    metrics.close()
+    if checkpointer: checkpointer.close()
+
+    agent.q_table = agent.as_backend(DenseQTable.from_dict(shared_tables[0]))
+    agent.q_table_2 = agent.as_backend(DenseQTable.from_dict(shared_tables[1]))
+    if worker_params:
+        agent.epsilon = float(np.mean([e for e, _ in worker_params.values()]))
+        agent.alpha = float(np.mean([a for _, a in worker_params.values()]))
+
+    agent.save_model(history=chart.history())
+    chart.save_plot()
+    chart.close()
+
+def play(game_map=None, filename=MODEL_FILE):
+    import pygame
+    from graphics import GameRenderer
+    env = PacmanEnv(game_map)
+    agent = load_player(filename)
     
     renderer = GameRenderer(env)
     clock = pygame.time.Clock()
@@ -156,7 +223,26 @@ def play():
     
     renderer.close()
 
+def play_replay(filename=REPLAY_FILE, index=None, visual=False, game_map=None):
+    recordings = load_recordings(filename)
+    if not visual:
+        replay_all(recordings, game_map)
+        return
+    
+    # Par défaut : le meilleur épisode du fichier
+    if index is None:
+        index = max(range(len(recordings)), key=lambda i: recordings[i]["score"])
+    env = PacmanEnv(game_map or load_map(recordings[index]["map"]), distance=recordings[index]["distance"])
+    from graphics import GameRenderer
+    renderer = GameRenderer(env)
+    renderer.fps = 10
+    score = replay(recordings[index], env, renderer)
+    print(f"Épisode {index} rejoué | Score: {score} (enregistré : {recordings[index]['score']}) | Niveau Atteint: {env.level}")
+    renderer.close()
+
 def main_menu():
+    import pygame
+    from graphics import GameRenderer
     pygame.init()
     env = PacmanEnv() 
     renderer = GameRenderer(env)
@@ -196,16 +282,51 @@ def main_menu():
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         parser = argparse.ArgumentParser()
-        parser.add_argument("--mode", choices=["train", "play"], required=True)
+        parser.add_argument("--mode", choices=["train", "play", "eval", "replay", "freeze"], required=True)
         parser.add_argument("--episodes", type=int, default=TOTAL_EPISODES)
         parser.add_argument("--visual", action="store_true")
+        parser.add_argument("--async-visual", action="store_true")
         parser.add_argument("--graphics", action="store_true")
         parser.add_argument("--load", action="store_true")
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--resume", action="store_true")
+        parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY)
+        parser.add_argument("--checkpoint-seconds", type=float, default=CHECKPOINT_SECONDS)
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--record", help="eval : fichier où enregistrer les épisodes (graine + actions)")
+        parser.add_argument("--replay", default=REPLAY_FILE)
+        parser.add_argument("--index", type=int, default=None)
+        parser.add_argument("--map", help=f"nom d'une carte de maps/ ou fichier .txt / .json (défaut : {MAP})")
+        parser.add_argument("--profile", action="store_true")
+        parser.add_argument("--profile-out", help="fichier pstats, ou trace Chrome si .json")
+        parser.add_argument("--profile-window", type=int, nargs=2, default=[0, 100], metavar=("DEBUT", "FIN"))
+        parser.add_argument("--model", default=MODEL_FILE, help="Q-Table, ou politique figée pour play / eval")
+        parser.add_argument("--policy", default=POLICY_FILE, help="freeze : fichier de la politique produite")
+        parser.add_argument("--tie-break", choices=TIE_BREAKS, default="random")
+        parser.add_argument("--algorithm", choices=list(ALGORITHMS), default=ALGORITHM)
         args = parser.parse_args()
         
-        if args.mode == "train":
-            train(args.episodes, args.visual, args.graphics, args.load)
+        if args.workers > 1 and (args.visual or args.async_visual):
+            parser.error("--visual n'est pas disponible avec --workers")
+        if args.workers > 1 and args.profile:
+            parser.error("--profile n'est pas disponible avec --workers")
+        
+        game_map = load_map(args.map) if args.map else None
+        
+        if args.mode == "train" and args.workers > 1:
+            train_parallel(args.episodes, args.workers, args.graphics, args.load, args.resume,
+                           args.checkpoint_every, args.checkpoint_seconds, args.seed, game_map, args.algorithm)
+        elif args.mode == "train":
+            train(args.episodes, args.visual, args.graphics, args.load, args.resume,
+                  args.checkpoint_every, args.checkpoint_seconds, args.async_visual,
+                  args.profile, args.profile_out, tuple(args.profile_window), args.seed, game_map, args.algorithm)
+        elif args.mode == "eval":
+            evaluate(args.episodes, args.workers, args.seed or 0, args.model, args.record, game_map)
+        elif args.mode == "freeze":
+            freeze_model(args.model, args.policy, args.tie_break, args.seed or 0)
+        elif args.mode == "replay":
+            play_replay(args.replay, args.index, args.visual, game_map)
         else:
-            play()
+            play(game_map, args.model)
     else:
         main_menu()
@@ -0,0 +1,74 @@
+import os
+import json
+from config import *
+
+# Fichiers de carte (dossier maps/) :
+#   .txt  : la grille seule, un caractère par case ; P = départ de Pac-Man, G = départ d'un fantôme
+#   .json : {"name", "layout": [lignes de la grille], "pacman": [r, c], "ghosts": [[r, c], ...], "ghost_count"}
+#           "pacman" / "ghosts" remplacent les marqueurs P / G (utile pour un départ sur une pastille),
+#           "ghost_count" reprend les départs en boucle s'il y a plus de fantômes que de départs
+TILE_CHARS = {'#': WALL, '.': DOT, 'o': POWER, ' ': EMPTY, 'P': EMPTY, 'G': EMPTY}
+
+class GameMap:
+    # Carte chargée : grille de départ d'un niveau et positions de départ
+    def __init__(self, grid, pacman_start, ghost_starts, name="custom"):
+        self.grid = grid
+        self.pacman_start = pacman_start
+        self.ghost_starts = ghost_starts
+        self.name = name
+        self.shape = (len(grid), len(grid[0]))
+
+    def __repr__(self):
+        return f"GameMap({self.name!r}, {self.shape[0]}x{self.shape[1]}, {len(self.ghost_starts)} fantômes)"
+
+_loaded = {}
+
+def map_path(name):
+    if os.path.exists(name): return name
+    for ext in (".json", ".txt"):
+        path = os.path.join(MAPS_DIR, name + ext)
+        if os.path.exists(path): return path
+    raise FileNotFoundError(f"Carte introuvable : {name} (fichier ou nom dans {MAPS_DIR}/)")
+
+def load_map(name=MAP):
+    path = map_path(name)
+    if path not in _loaded:
+        _loaded[path] = _read_map(path)
+    return _loaded[path]
+
+def _read_map(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    if path.endswith(".json"):
+        with open(path) as f:
+            data = json.load(f)
+        return parse_map(data["layout"], data.get("name", name), data.get("pacman"), data.get("ghosts"),
+                         data.get("ghost_count"))
+    with open(path) as f:
+        return parse_map([line.rstrip("\n") for line in f if line.strip()], name)
+
+def parse_map(lines, name="custom", pacman=None, ghosts=None, ghost_count=None):
+    if not lines or any(len(line) != len(lines[0]) for line in lines):
+        raise ValueError(f"Carte {name} : toutes les lignes doivent avoir la même longueur")
+    unknown = set("".join(lines)) - set(TILE_CHARS)
+    if unknown:
+        raise ValueError(f"Carte {name} : caractères inconnus {sorted(unknown)}")
+
+    grid = [[TILE_CHARS[ch] for ch in line] for line in lines]
+    h, w = len(grid), len(grid[0])
+    # Les déplacements des fantômes (maze.py) supposent une carte fermée
+    if any(v != WALL for v in grid[0] + grid[-1] + [row[0] for row in grid] + [row[-1] for row in grid]):
+        raise ValueError(f"Carte {name} : le bord doit être entièrement fait de murs")
+
+    markers = {ch: [(r, c) for r, line in enumerate(lines) for c, x in enumerate(line) if x == ch] for ch in "PG"}
+    pacman = tuple(pacman) if pacman is not None else (markers['P'][0] if len(markers['P']) == 1 else None)
+    if pacman is None:
+        raise ValueError(f"Carte {name} : il faut exactement un départ de Pac-Man (P)")
+    ghosts = [tuple(g) for g in ghosts] if ghosts is not None else markers['G']
+    if ghost_count is not None:
+        if not ghosts and ghost_count: raise ValueError(f"Carte {name} : aucun départ de fantôme (G)")
+        ghosts = [ghosts[i % len(ghosts)] for i in range(ghost_count)]
+
+    for r, c in [pacman] + ghosts:
+        if not (0 <= r < h and 0 <= c < w) or grid[r][c] == WALL:
+            raise ValueError(f"Carte {name} : départ {(r, c)} dans un mur ou hors de la grille")
+    return GameMap(grid, pacman, ghosts, name)
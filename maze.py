@@ -0,0 +1,149 @@
+import os
+import pickle
+import hashlib
+from collections import deque
+import numpy as np
+from config import *
+
+ACTION_DELTAS = {UP: (-1, 0), DOWN: (1, 0), LEFT: (0, -1), RIGHT: (0, 1)}
+# Ordre des déplacements testés par les fantômes
+GHOST_DELTAS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+RAY_LENGTH = 7
+MAZE_FORMAT = 3  # à incrémenter quand Maze change : invalide le cache disque
+
+_compiled = {}
+
+def compile_maze(game_map, cache_dir=MAZE_CACHE_DIR):
+    # Une compilation par carte et par processus ; entre deux lancements, les cartes compilées
+    # sont relues depuis cache_dir (clé = hash de la grille)
+    key = tuple(tuple(row) for row in game_map)
+    if key not in _compiled:
+        _compiled[key] = _load_or_build(game_map, key, cache_dir)
+    return _compiled[key]
+
+def _load_or_build(game_map, key, cache_dir):
+    if not cache_dir: return Maze(game_map)
+    digest = hashlib.sha1(repr((MAZE_FORMAT, RAY_LENGTH, key)).encode()).hexdigest()[:20]
+    filename = os.path.join(cache_dir, f"{digest}.pkl")
+    try:
+        with open(filename, 'rb') as f:
+            cached = pickle.load(f)
+        if isinstance(cached, Maze): return cached
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+        # Cache absent, tronqué ou écrit par une autre version : on recompile
+        pass
+
+    maze = Maze(game_map)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{filename}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(maze, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, filename)
+    except OSError as e:
+        print(f"Cache de carte non écrit : {e}")
+    return maze
+
+class Maze:
+    # Géométrie statique d'une carte, calculée une seule fois : les murs ne changent jamais en cours de partie
+    def __init__(self, game_map):
+        self.layout = [row[:] for row in game_map]
+        self.shape = (len(game_map), len(game_map[0]))
+        h, w = self.shape
+
+        self.next_cell = [[[None] * len(ACTIONS) for _ in range(w)] for _ in range(h)]
+        self.wall_mask = [[0] * w for _ in range(h)]
+        self.ghost_moves = [[[] for _ in range(w)] for _ in range(h)]
+        self.rays = [[[] for _ in range(w)] for _ in range(h)]
+        # Pastilles triées par distance depuis chaque case, remplies à la première demande (sort_pellets) :
+        # Manhattan (pellet_order) ou distance réelle (maze_pellet_order)
+        self.pellet_order = [[None] * w for _ in range(h)]
+        self.maze_pellet_order = [[None] * w for _ in range(h)]
+
+        pellets = [(r, c) for r in range(h) for c in range(w) if game_map[r][c] in [DOT, POWER]]
+
+        for r in range(h):
+            for c in range(w):
+                for a, (dr, dc) in ACTION_DELTAS.items():
+                    nr, nc = r + dr, c + dc
+                    if 0 <= nr < h and 0 <= nc < w and game_map[nr][nc] != WALL:
+                        self.next_cell[r][c][a] = (nr, nc)
+                    else:
+                        self.wall_mask[r][c] |= 1 << a
+
+                # Le rayon s'arrête au bord de la grille mais pas aux murs, pour garder les mêmes états
+                self.rays[r][c] = [
+                    [(r + dr * i, c + dc * i) for i in range(1, RAY_LENGTH + 1)
+                     if 0 <= r + dr * i < h and 0 <= c + dc * i < w]
+                    for dr, dc in ACTION_DELTAS.values()
+                ]
+
+                if game_map[r][c] == WALL:
+                    continue
+                # Comme l'indexation Python d'origine, la carte est supposée entourée de murs
+                self.ghost_moves[r][c] = [((r + dr) % h, (c + dc) % w) for dr, dc in GHOST_DELTAS
+                                          if game_map[(r + dr) % h][(c + dc) % w] != WALL]
+
+        # Distances réelles dans le labyrinthe (DISTANCE = "MAZE") : rien n'est calculé à la compilation,
+        # chaque champ de distance est un BFS fait à la première demande
+        self.pellets = pellets
+        self.unreachable = h * w
+        self._distance = None
+        self._fields = {}
+
+    def _bfs(self, start):
+        # {case: distance} pour les cases accessibles depuis start
+        seen = {start: 0}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            d = seen[cell] + 1
+            for nxt in self.next_cell[cell[0]][cell[1]]:
+                if nxt is not None and nxt not in seen:
+                    seen[nxt] = d
+                    queue.append(nxt)
+        return seen
+
+    def sort_pellets(self, r, c, maze_distance=False):
+        # Tri par (distance, ligne, colonne) : même départage qu'un scan ligne par ligne.
+        # En distance réelle, seules les pastilles accessibles sont gardées
+        if maze_distance:
+            seen = self._bfs((r, c))
+            order = sorted((p for p in self.pellets if p in seen), key=lambda p: (seen[p], p[0], p[1]))
+            self.maze_pellet_order[r][c] = order
+        else:
+            order = sorted(self.pellets, key=lambda p: (abs(p[0] - r) + abs(p[1] - c), p[0], p[1]))
+            self.pellet_order[r][c] = order
+        return order
+
+    def all_pairs_distances(self):
+        # distance[a, b] entre cases à plat (r * w + c), `unreachable` si pas de chemin : (h * w)² entiers,
+        # seulement pour VecPacmanEnv en DISTANCE = "MAZE"
+        if self._distance is None:
+            h, w = self.shape
+            distance = np.full((h * w, h * w), self.unreachable, dtype=np.int32)
+            for r in range(h):
+                for c in range(w):
+                    if self.layout[r][c] == WALL: continue
+                    row = distance[r * w + c]
+                    for (nr, nc), d in self._bfs((r, c)).items():
+                        row[nr * w + nc] = d
+            self._distance = distance
+        return self._distance
+
+    def distance_field(self, pos):
+        # Distances depuis pos sous forme de grille de listes (lecture O(1) en Python), calculée à la première demande
+        field = self._fields.get(pos)
+        if field is None:
+            h, w = self.shape
+            field = [[self.unreachable] * w for _ in range(h)]
+            for (r, c), d in self._bfs(pos).items():
+                field[r][c] = d
+            self._fields[pos] = field
+        return field
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_fields'] = {}
+        state['_distance'] = None
+        return state
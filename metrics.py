@@ -0,0 +1,108 @@
+import os
+import csv
+import queue
+import threading
+import numpy as np
+from config import *
+
+LOG_COLUMNS = [("Episode", "<i8"), ("Score", "<i8"), ("Steps", "<i8"), ("Epsilon", "<f8"), ("GhostsEaten", "<i8")]
+
+class RollingMean:
+    # Moyenne glissante en O(1) sur une fenêtre fixe (tampon circulaire + somme courante)
+    def __init__(self, window=50):
+        self.window = window
+        self.values = np.zeros(window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        i = self.count % self.window
+        if self.count >= self.window:
+            self.total -= self.values[i]
+        self.values[i] = value
+        self.total += value
+        self.count += 1
+        return self.mean
+
+    @property
+    def mean(self):
+        return self.total / min(self.count, self.window) if self.count else 0.0
+
+class MetricsSink:
+    # Journal d'entraînement par lots : les lignes remplissent des blocs NumPy préalloués,
+    # chaque bloc plein est écrit par un thread en arrière-plan puis recyclé.
+    # fmt="CSV" -> LOG_FILE ; fmt="BINARY" -> un fichier brut par colonne dans LOG_DIR (voir load_log)
+    def __init__(self, fmt=LOG_FORMAT, batch_size=LOG_BATCH_SIZE, blocks=4, window=50):
+        self.fmt = fmt
+        self.dtype = np.dtype(LOG_COLUMNS)
+        self.blocks = [np.zeros(batch_size, dtype=self.dtype) for _ in range(blocks)]
+        self.free = queue.Queue()
+        for i in range(1, blocks): self.free.put(i)
+        self.pending = queue.Queue()
+        self.current = 0
+        self.size = 0
+        self.avg_score = RollingMean(window)
+
+        if fmt == "CSV":
+            os.makedirs(os.path.dirname(LOG_FILE) or ".", exist_ok=True)
+            if not os.path.exists(LOG_FILE) or os.path.getsize(LOG_FILE) == 0:
+                with open(LOG_FILE, 'w', newline='') as f:
+                    csv.writer(f).writerow([name for name, _ in LOG_COLUMNS])
+        else:
+            os.makedirs(LOG_DIR, exist_ok=True)
+
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+
+    def log(self, episode, score, steps, epsilon, ghosts_eaten):
+        block = self.blocks[self.current]
+        block[self.size] = (episode, score, steps, epsilon, ghosts_eaten)
+        self.size += 1
+        self.avg_score.add(score)
+        if self.size == len(block):
+            self.flush()
+
+    def flush(self):
+        if self.size == 0: return
+        self.pending.put((self.current, self.size))
+        # Ne bloque que si le thread d'écriture a pris du retard sur tous les blocs
+        self.current = self.free.get()
+        self.size = 0
+
+    def _writer(self):
+        while True:
+            item = self.pending.get()
+            if item is None: break
+            index, size = item
+            try:
+                self._write(self.blocks[index][:size])
+            except OSError as e:
+                print(f"Échec d'écriture du journal d'entraînement : {e}")
+            self.free.put(index)
+
+    def _write(self, rows):
+        if self.fmt == "CSV":
+            with open(LOG_FILE, 'a', newline='') as f:
+                csv.writer(f).writerows(rows.tolist())
+        else:
+            for name, _ in LOG_COLUMNS:
+                with open(os.path.join(LOG_DIR, f"{name}.bin"), 'ab') as f:
+                    f.write(np.ascontiguousarray(rows[name]).tobytes())
+
+    def close(self):
+        self.flush()
+        self.pending.put(None)
+        self.thread.join()
+
+def load_log(directory=LOG_DIR):
+    # Colonnes du journal binaire projetées en mémoire, tronquées à la plus courte
+    # (une écriture interrompue peut laisser une colonne en avance)
+    columns = {}
+    for name, dtype in LOG_COLUMNS:
+        filename = os.path.join(directory, f"{name}.bin")
+        if not os.path.exists(filename) or os.path.getsize(filename) == 0:
+            columns[name] = np.zeros(0, dtype=dtype)
+        else:
+            columns[name] = np.memmap(filename, dtype=dtype, mode='r')
+    length = min(len(c) for c in columns.values())
+    return {name: c[:length] for name, c in columns.items()}
@@ -0,0 +1,180 @@
+import os
+import sys
+import struct
+import pickle
+import numpy as np
+from config import *
+from game_env import encode_state, decode_state
+
+# Format binaire versionné :
+#   en-tête (64 octets) : magic, version, nb d'états table 1, nb d'états table 2, epsilon, alpha
+#   puis pour chaque table : clés int32[n] triées (encode_state) et valeurs float32[n, 4]
+MAGIC = b"PACMANQT"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIqqdd")
+HEADER_SIZE = 64
+
+class MappedQTable:
+    # Q-Table en lecture seule projetée en mémoire (np.memmap) : démarrage quasi instantané pour play/évaluation.
+    # Les états ajoutés après le chargement vont dans un petit dict à part, le fichier n'est jamais modifié.
+    def __init__(self, keys, values):
+        self.keys = keys
+        self.values = values
+        self.extra = {}
+
+    def _index(self, state):
+        return int(state) if isinstance(state, (int, np.integer)) else encode_state(state)
+
+    def _find(self, index):
+        i = int(np.searchsorted(self.keys, index))
+        return i if i < len(self.keys) and self.keys[i] == index else None
+
+    def get(self, state, default=None):
+        index = self._index(state)
+        i = self._find(index)
+        if i is not None: return self.values[i]
+        return self.extra.get(index, default)
+
+    def __getitem__(self, state):
+        q_values = self.get(state)
+        if q_values is None: raise KeyError(state)
+        return q_values
+
+    def __setitem__(self, state, q_values):
+        index = self._index(state)
+        if self._find(index) is not None:
+            raise TypeError("MappedQTable est en lecture seule")
+        self.extra[index] = np.array(q_values, dtype=np.float32)
+
+    def __contains__(self, state):
+        return self.get(state) is not None
+
+    def __len__(self):
+        return len(self.keys) + len(self.extra)
+
+    def items(self):
+        for i, index in enumerate(self.keys):
+            yield decode_state(index), self.values[i]
+        for index, q_values in self.extra.items():
+            yield decode_state(index), q_values
+
+    def to_dict(self):
+        return {state: np.array(q_values, dtype=np.float32) for state, q_values in self.items()}
+
+    def pack(self):
+        if not self.extra:
+            return np.asarray(self.keys), np.asarray(self.values)
+        keys = np.concatenate([self.keys, np.fromiter(self.extra.keys(), dtype=np.int32)])
+        values = np.concatenate([self.values, np.array(list(self.extra.values()), dtype=np.float32).reshape(-1, len(ACTIONS))])
+        order = np.argsort(keys)
+        return keys[order], values[order]
+
+def pack_table(table):
+    if hasattr(table, "pack"):
+        return table.pack()
+    keys = np.array([encode_state(state) for state in table], dtype=np.int32)
+    values = np.array(list(table.values()), dtype=np.float32).reshape(-1, len(ACTIONS))
+    order = np.argsort(keys)
+    return keys[order], values[order]
+
+def _write_atomic(filename, write):
+    # Écriture dans un fichier temporaire du même dossier puis renommage : jamais de modèle à moitié écrit
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+    tmp = f"{filename}.tmp"
+    with open(tmp, 'wb') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+
+def save_qtables(filename, tables, epsilon, alpha):
+    packed = [pack_table(table) for table in tables]
+
+    def write(f):
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, len(packed[0][0]), len(packed[1][0]), epsilon, alpha)
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        for keys, values in packed:
+            f.write(keys.astype("<i4").tobytes())
+            f.write(values.astype("<f4").tobytes())
+
+    _write_atomic(filename, write)
+
+def load_qtables(filename):
+    with open(filename, 'rb') as f:
+        magic, version, n1, n2, epsilon, alpha = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{filename} n'est pas un modèle Pac-Man")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Version de modèle {version} non supportée (attendue : {FORMAT_VERSION})")
+
+    tables = []
+    offset = HEADER_SIZE
+    for n in (n1, n2):
+        if n == 0:
+            keys = np.zeros(0, dtype="<i4")
+            values = np.zeros((0, len(ACTIONS)), dtype="<f4")
+        else:
+            keys = np.memmap(filename, dtype="<i4", mode='r', offset=offset, shape=(n,))
+            values = np.memmap(filename, dtype="<f4", mode='r', offset=offset + 4 * n, shape=(n, len(ACTIONS)))
+        tables.append(MappedQTable(keys, values))
+        offset += 4 * n + 4 * n * len(ACTIONS)
+    return tables, epsilon, alpha
+
+# Politique gloutonne figée (policy.py) : en-tête de 64 octets (magic, version, nb d'états connus,
+# départage, graine) puis clés int32[n] triées (encode_state) et actions uint8[n].
+# Les états absents reçoivent l'action de remplissage recalculée au chargement à partir du départage et de la graine.
+POLICY_MAGIC = b"PACMANPL"
+POLICY_VERSION = 1
+POLICY_HEADER = struct.Struct("<8sIq8sQ")
+
+def save_policy(filename, keys, actions, tie_break, seed):
+    def write(f):
+        header = POLICY_HEADER.pack(POLICY_MAGIC, POLICY_VERSION, len(keys), tie_break.encode(), seed)
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        f.write(np.asarray(keys, dtype="<i4").tobytes())
+        f.write(np.asarray(actions, dtype=np.uint8).tobytes())
+    _write_atomic(filename, write)
+
+def is_policy_file(filename):
+    with open(filename, 'rb') as f:
+        return f.read(len(POLICY_MAGIC)) == POLICY_MAGIC
+
+def load_policy(filename):
+    # -> (clés, actions, départage, graine)
+    with open(filename, 'rb') as f:
+        magic, version, n, tie_break, seed = POLICY_HEADER.unpack(f.read(POLICY_HEADER.size))
+        if magic != POLICY_MAGIC:
+            raise ValueError(f"{filename} n'est pas une politique Pac-Man")
+        if version != POLICY_VERSION:
+            raise ValueError(f"Version de politique {version} non supportée (attendue : {POLICY_VERSION})")
+        f.seek(HEADER_SIZE)
+        keys = np.frombuffer(f.read(4 * n), dtype="<i4")
+        actions = np.frombuffer(f.read(n), dtype=np.uint8)
+    if len(actions) != n:
+        raise ValueError(f"{filename} est tronqué")
+    return keys, actions, tie_break.rstrip(b"\0").decode(), seed
+
+def history_file(filename):
+    return os.path.splitext(filename)[0] + "_history.npz"
+
+def save_history(filename, history):
+    _write_atomic(filename, lambda f: np.savez(f, **{k: np.asarray(v) for k, v in history.items()}))
+
+def load_history(filename):
+    if not os.path.exists(filename): return None
+    with np.load(filename) as data:
+        return {k: data[k].tolist() for k in data.files}
+
+def convert_pickle(src, dst=MODEL_FILE):
+    with open(src, 'rb') as f:
+        data = pickle.load(f)
+    save_qtables(dst, [data["q_table"], data.get("q_table_2", {})], data.get("epsilon", EPSILON_START), data.get("alpha", ALPHA_START))
+    if data.get("history"):
+        save_history(history_file(dst), data["history"])
+    print(f"{src} converti vers {dst}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(f"Usage : python model_io.py {LEGACY_MODEL_FILE} [{MODEL_FILE}]")
+        sys.exit(1)
+    convert_pickle(*sys.argv[1:3])
@@ -0,0 +1,51 @@
+import multiprocessing as mp
+import signal
+import numpy as np
+from config import *
+from game_env import PacmanEnv, NUM_STATES
+from agent import QLearningAgent, DenseQTable
+from training import run_training_episode
+
+def create_shared_table():
+    return mp.RawArray('f', NUM_STATES * len(ACTIONS)), mp.RawArray('b', NUM_STATES)
+
+def attach_shared_table(buffers):
+    values, visited = buffers
+    return DenseQTable(np.frombuffer(values, dtype=np.float32).reshape(NUM_STATES, len(ACTIONS)),
+                       np.frombuffer(visited, dtype=np.bool_))
+
+def run_worker(worker_id, episodes, seed, tables, epsilon, alpha, stats_queue, stop_event, game_map=None,
+               algorithm=ALGORITHM):
+    # Le processus principal gère Ctrl+C et prévient les workers via stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    env_seed, agent_seed = np.random.SeedSequence(seed).spawn(2)
+
+    env = PacmanEnv(game_map, seed=env_seed)
+    agent = QLearningAgent(backend="DENSE", seed=agent_seed, algorithm=algorithm)
+    # Mises à jour sans verrou (style Hogwild) directement dans les Q-Tables partagées
+    agent.q_table, agent.q_table_2 = (attach_shared_table(t) for t in tables)
+    agent.epsilon, agent.alpha = epsilon, alpha
+    if EXPERIENCE_SIZE: agent.enable_replay()
+
+    try:
+        for _ in range(episodes):
+            if stop_event.is_set(): break
+
+            score, steps, ghosts = run_training_episode(env, agent)
+            stats_queue.put((worker_id, (score, steps, agent.epsilon, agent.alpha, ghosts, env.level)))
+    finally:
+        # Toujours signaler la fin, même en cas d'erreur, pour ne pas bloquer le processus principal
+        stats_queue.put((worker_id, None))
+
+def start_workers(workers, episodes, tables, epsilon, alpha, seed=None, game_map=None, algorithm=ALGORITHM):
+    stats_queue = mp.Queue()
+    stop_event = mp.Event()
+    seeds = np.random.SeedSequence(seed).generate_state(workers)
+
+    processes = []
+    for i in range(workers):
+        worker_episodes = episodes // workers + (1 if i < episodes % workers else 0)
+        p = mp.Process(target=run_worker, args=(i, worker_episodes, int(seeds[i]), tables, epsilon, alpha, stats_queue, stop_event, game_map, algorithm))
+        p.start()
+        processes.append(p)
+    return processes, stats_queue, stop_event
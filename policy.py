@@ -0,0 +1,89 @@
+import os
+import numpy as np
+from config import *
+from game_env import NUM_STATES, RADAR_VALUES, encode_state
+from agent import QLearningAgent
+from model_io import pack_table, save_policy, load_policy, is_policy_file
+
+TIE_BREAKS = ["random", "first"]
+
+def fill_actions(tie_break, seed):
+    # Action des états jamais vus (Q-valeurs toutes nulles, donc à égalité). Un tirage figé pourrait viser
+    # un mur indéfiniment (l'état ne change pas) : on choisit parmi les directions sans mur d'après le radar
+    # de l'état, la première ou une tirée une fois pour toutes (reproductible à partir de la graine)
+    radar = np.arange(NUM_STATES) // 10
+    free = np.stack([radar // RADAR_VALUES ** (3 - a) % RADAR_VALUES < 6 for a in ACTIONS], axis=1)
+    free[~free.any(axis=1)] = True
+    if tie_break == "first":
+        return free.argmax(axis=1).astype(np.uint8)
+    rng = np.random.default_rng(seed)
+    return np.where(free, rng.random(free.shape), -1.0).argmax(axis=1).astype(np.uint8)
+
+class GreedyPolicy:
+    # Politique gloutonne figée : une action uint8 par état (indexée par encode_state), sans Q-valeurs.
+    # Jouer une action = une lecture dans un bytes ; rien n'est ajouté pour un état jamais vu à l'entraînement.
+    # Seuls les états connus sont enregistrés (5 octets par état), les autres sont recalculés au chargement.
+    def __init__(self, keys, actions, tie_break="random", seed=0):
+        self.keys = np.asarray(keys, dtype=np.int32)
+        self.known_actions = np.asarray(actions, dtype=np.uint8)
+        self.tie_break = tie_break
+        self.seed = seed
+        self.actions = fill_actions(tie_break, seed)
+        self.actions[self.keys] = self.known_actions
+        self.table = self.actions.tobytes()
+
+    def choose_action(self, state, training=False):
+        return self.table[state if isinstance(state, int) else encode_state(state)]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def save(self, filename=POLICY_FILE):
+        save_policy(filename, self.keys, self.known_actions, self.tie_break, self.seed)
+        print(f"Politique de {len(self)} états ({os.path.getsize(filename) / 1024:.1f} Ko) sauvegardée dans {filename}")
+
+    @classmethod
+    def load(cls, filename=POLICY_FILE):
+        return cls(*load_policy(filename))
+
+def freeze(agent, tie_break="random", seed=0):
+    # Action gloutonne de chaque état connu sur Q1 (+ Q2 si remplie, Double Q). Égalités : "first" = première
+    # action, "random" = tirage fait une fois pour toutes (graine fixe) au lieu d'un tirage à chaque pas
+    if tie_break not in TIE_BREAKS:
+        raise ValueError(f"Départage inconnu : {tie_break} ({' ou '.join(TIE_BREAKS)})")
+    packed = [pack_table(table) for table in [agent.q_table, agent.q_table_2] if len(table)]
+    keys = np.unique(np.concatenate([k for k, _ in packed]))
+    values = np.zeros((len(keys), len(ACTIONS)), dtype=np.float32)
+    for table_keys, q_values in packed:
+        values[np.searchsorted(keys, table_keys)] += q_values
+
+    ties = values == values.max(axis=1, keepdims=True)
+    # Toutes les actions à égalité (ex. lignes à zéro créées par une simple lecture) : traité comme un état inconnu
+    keep = ~ties.all(axis=1)
+    keys, values, ties = keys[keep], values[keep], ties[keep]
+    if tie_break == "first":
+        actions = ties.argmax(axis=1)
+    else:
+        # Flux distinct de celui de fill_actions
+        rng = np.random.default_rng([seed, 1])
+        actions = np.where(ties, rng.random(values.shape), -1.0).argmax(axis=1)
+    return GreedyPolicy(keys, actions, tie_break, seed)
+
+def freeze_model(filename=MODEL_FILE, out=POLICY_FILE, tie_break="random", seed=0):
+    agent = QLearningAgent()
+    agent.load_model(filename, mmap=True)
+    if not len(agent.q_table):
+        print("Q-Table vide : rien à figer.")
+        return None
+    policy = freeze(agent, tie_break, seed)
+    policy.save(out)
+    return policy
+
+def load_player(filename=MODEL_FILE):
+    # Joueur glouton pour play / évaluation : politique figée ou Q-Table projetée en mémoire
+    if os.path.exists(filename) and is_policy_file(filename):
+        print(f"Politique chargée depuis {filename}")
+        return GreedyPolicy.load(filename)
+    agent = QLearningAgent()
+    agent.load_model(filename, mmap=True)
+    return agent
@@ -0,0 +1,87 @@
+import json
+import time
+import cProfile
+import numpy as np
+
+class Profiler:
+    # Chronométrage par étape de la boucle d'entraînement (--profile). Les méthodes mesurées sont
+    # remplacées par des versions chronométrées sur les instances : sans --profile rien n'est modifié,
+    # le coût est nul. Les temps sont exclusifs (env.step n'inclut pas env.get_state qu'il appelle).
+    # out : fichier écrit pour la fenêtre d'épisodes `window` (.json -> trace Chrome, sinon pstats)
+    def __init__(self, out=None, window=(0, 100)):
+        self.out = out
+        self.window = window
+        self.samples = {}
+        self.stack = []
+        self.last_report = time.perf_counter_ns()
+
+        self.trace = None
+        self.trace_origin = 0
+        self.cprofile = None
+
+    def instrument(self, obj, method, name):
+        fn = getattr(obj, method)
+        samples = self.samples.setdefault(name, [])
+        stack = self.stack
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            stack.append(0)
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                samples.append(elapsed - stack.pop())
+                if stack: stack[-1] += elapsed
+                if self.trace is not None:
+                    self.trace.append((name, start, elapsed))
+
+        setattr(obj, method, timed)
+
+    def begin_episode(self, episode):
+        # episode : index relatif au début de l'entraînement
+        start, end = self.window
+        if self.out is None: return
+        if episode == start:
+            if self.out.endswith(".json"):
+                self.trace = []
+                self.trace_origin = time.perf_counter_ns()
+            else:
+                self.cprofile = cProfile.Profile()
+                self.cprofile.enable()
+        elif episode == end:
+            self._dump()
+
+    def report(self):
+        # Totaux et percentiles par étape depuis le dernier rapport, puis remise à zéro
+        now = time.perf_counter_ns()
+        wall = max(now - self.last_report, 1)
+        self.last_report = now
+        lines = []
+        for name, samples in self.samples.items():
+            if not samples: continue
+            values = np.array(samples) / 1000
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            lines.append(f"    {name:<20} {values.sum() / 1e3:>8.1f}ms {100 * values.sum() * 1000 / wall:>5.1f}% "
+                         f"| n={len(values):<7} p50 {p50:.1f}µs p95 {p95:.1f}µs p99 {p99:.1f}µs")
+            samples.clear()
+        return "\n".join(lines)
+
+    def _dump(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.out)
+            self.cprofile = None
+            print(f"Profil cProfile enregistré dans {self.out}")
+        elif self.trace is not None:
+            events = [{"name": name, "ph": "X", "pid": 0, "tid": 0,
+                       "ts": (start - self.trace_origin) / 1000, "dur": elapsed / 1000}
+                      for name, start, elapsed in self.trace]
+            self.trace = None
+            with open(self.out, "w") as f:
+                json.dump({"traceEvents": events}, f)
+            print(f"Trace Chrome enregistrée dans {self.out} (chrome://tracing ou Perfetto)")
+
+    def close(self):
+        self._dump()
@@ -0,0 +1,98 @@
+import multiprocessing as mp
+import queue
+import time
+from config import *
+
+class SnapshotEnv:
+    # Miroir minimal de PacmanEnv dans le processus de rendu : uniquement les attributs lus par GameRenderer
+    def __init__(self, game_map):
+        self.game_map = game_map
+        self.grid_shape = game_map.shape
+        self.level_key = None
+        self.grid = [row[:] for row in game_map.grid]
+        self.eaten = []
+        self.pacman_pos = game_map.pacman_start
+        self.ghosts = []
+        self.score = 0
+        self.lives = INITIAL_LIVES
+        self.level = 1
+        self.info = {}
+
+    def apply(self, snapshot):
+        level_key, pacman_pos, ghosts, eaten, score, lives, level, info = snapshot
+        if level_key != self.level_key:
+            # Nouvelle grille -> GameRenderer reconstruit ses couches
+            self.level_key = level_key
+            self.grid = [row[:] for row in self.game_map.grid]
+            self.eaten = []
+        for r, c in eaten:
+            self.grid[r][c] = EMPTY
+        self.eaten.extend(eaten)
+        self.pacman_pos = pacman_pos
+        self.ghosts = [{'pos': pos, 'scared': scared, 'color': color} for pos, scared, color in ghosts]
+        self.score, self.lives, self.level, self.info = score, lives, level, info
+
+def run_renderer(snapshot_queue, stop_event, game_map):
+    import pygame
+    from graphics import GameRenderer
+
+    env = SnapshotEnv(game_map)
+    renderer = GameRenderer(env)
+    while not stop_event.is_set():
+        # On applique tous les snapshots en attente (deltas de pastilles) mais on n'affiche que le dernier
+        try:
+            while True:
+                env.apply(snapshot_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                stop_event.set()
+
+        renderer.render(info_dict=env.info)
+    renderer.close()
+
+class RenderProcess:
+    # Même interface que GameRenderer pour la boucle d'entraînement : render() publie un snapshot léger
+    # vers un processus de rendu qui affiche le plus récent à son propre rythme (FPS) ; l'entraînement ne
+    # bloque jamais, les snapshots en trop sont abandonnés.
+    def __init__(self, env, fps=FPS):
+        self.env = env
+        self.interval = 1.0 / fps
+        self.last_publish = 0.0
+        self.grid = None
+        self.level_key = 0
+        self.eaten_sent = 0
+
+        ctx = mp.get_context("spawn")
+        self.queue = ctx.Queue(maxsize=2)
+        self.stop_event = ctx.Event()
+        self.process = ctx.Process(target=run_renderer, args=(self.queue, self.stop_event, env.game_map), daemon=True)
+        self.process.start()
+
+    def render(self, info_dict={}):
+        env = self.env
+        if env.grid is not self.grid:
+            self.grid = env.grid
+            self.level_key += 1
+            self.eaten_sent = 0
+
+        now = time.perf_counter()
+        if now - self.last_publish < self.interval or self.stop_event.is_set():
+            return
+
+        # Les pastilles mangées depuis le dernier envoi réussi restent en attente si la file est pleine
+        snapshot = (self.level_key, env.pacman_pos, [(g['pos'], g['scared'], g['color']) for g in env.ghosts],
+                    env.eaten[self.eaten_sent:], env.score, env.lives, env.level, dict(info_dict))
+        try:
+            self.queue.put_nowait(snapshot)
+        except queue.Full:
+            return
+        self.last_publish = now
+        self.eaten_sent = len(env.eaten)
+
+    def close(self):
+        self.stop_event.set()
+        self.queue.cancel_join_thread()
+        self.process.join(timeout=5)
@@ -0,0 +1,68 @@
+import os
+import time
+import numpy as np
+from config import *
+from game_env import PacmanEnv
+from maps import load_map
+
+# Un épisode enregistré = graine de l'épisode + suite d'actions (1 octet par pas) + score obtenu + carte
+# et mode de distance (DISTANCE) de l'environnement.
+# Les fantômes ne dépendent que de la graine (PacmanEnv.reset(seed)), rejouer les actions
+# reproduit donc exactement la partie, sans stocker d'images.
+
+def record(env):
+    return {"seed": env.seed, "actions": bytes(env.actions), "score": env.score, "map": env.game_map.name, "distance": env.distance}
+
+def save_recordings(filename, recordings):
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+    lengths = [len(r["actions"]) for r in recordings]
+    with open(filename, 'wb') as f:
+        np.savez_compressed(f,
+                            seeds=np.array([r["seed"] for r in recordings], dtype=np.int64),
+                            scores=np.array([r["score"] for r in recordings], dtype=np.int64),
+                            maps=np.array([r["map"] for r in recordings]),
+                            distances=np.array([r["distance"] for r in recordings]),
+                            offsets=np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+                            actions=np.frombuffer(b"".join(r["actions"] for r in recordings), dtype=np.uint8))
+
+def load_recordings(filename=REPLAY_FILE):
+    with np.load(filename) as data:
+        seeds, scores, maps, distances, offsets, actions = (
+            data[k] for k in ("seeds", "scores", "maps", "distances", "offsets", "actions"))
+    return [{"seed": int(seeds[i]), "actions": actions[offsets[i]:offsets[i + 1]].tobytes(), "score": int(scores[i]),
+             "map": str(maps[i]), "distance": str(distances[i])} for i in range(len(seeds))]
+
+def replay(recording, env=None, renderer=None):
+    # Rejoue l'épisode dans env (éventuellement affiché par renderer) ; renvoie le score obtenu
+    env = env or PacmanEnv(load_map(recording["map"]), distance=recording["distance"])
+    if env.game_map.name != recording["map"]:
+        print(f"Attention : épisode enregistré sur la carte {recording['map']}, rejoué sur {env.game_map.name}")
+    if env.distance != recording["distance"]:
+        print(f"Attention : épisode enregistré avec DISTANCE={recording['distance']}, rejoué avec {env.distance}")
+    env.reset(seed=recording["seed"])
+    for action in recording["actions"]:
+        if renderer:
+            renderer.render(info_dict={'episode': 0, 'epsilon': 0.0})
+        _, _, _, info = env.step(action)
+        if info.get("level_cleared", False):
+            env.next_level()
+    if renderer:
+        renderer.render(info_dict={'episode': 0, 'epsilon': 0.0})
+    return env.score
+
+def replay_all(recordings, game_map=None):
+    # Sans carte imposée, chaque épisode est rejoué sur la carte de maps/ dont il porte le nom
+    envs = {}
+    def env_for(recording):
+        key = (recording["map"], recording["distance"])
+        if key not in envs:
+            envs[key] = PacmanEnv(game_map or load_map(recording["map"]), distance=recording["distance"])
+        return envs[key]
+    start = time.perf_counter()
+    mismatches = [i for i, r in enumerate(recordings) if replay(r, env_for(r)) != r["score"]]
+    elapsed = time.perf_counter() - start
+    steps = sum(len(r["actions"]) for r in recordings)
+    print(f"{len(recordings)} épisodes rejoués ({steps} pas) en {elapsed:.2f}s ({steps / max(elapsed, 1e-9):.0f} pas/s)")
+    if mismatches:
+        print(f"Scores différents de l'enregistrement pour les épisodes {mismatches}")
+    return mismatches
@@ -0,0 +1,34 @@
+import numpy as np
+
+class RandomStream:
+    # Flux de nombres uniformes propre à un environnement ou un agent (numpy.random.Generator),
+    # tirés par blocs : un appel NumPy pour `block` tirages au lieu d'un appel par tirage.
+    # La suite obtenue est la même que celle de rng.random(n) quel que soit `block`.
+    def __init__(self, seed=None, block=256):
+        self.block = block
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.buffer = []
+        self.pos = 0
+
+    def random(self):
+        if self.pos == len(self.buffer):
+            self.buffer = self.rng.random(self.block).tolist()
+            self.pos = 0
+        value = self.buffer[self.pos]
+        self.pos += 1
+        return value
+
+    def draw(self, n):
+        # n tirages d'un coup (n <= block)
+        if self.pos + n > len(self.buffer):
+            self.buffer = self.buffer[self.pos:] + self.rng.random(self.block).tolist()
+            self.pos = 0
+        values = self.buffer[self.pos:self.pos + n]
+        self.pos += n
+        return values
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
@@ -0,0 +1,178 @@
+import os
+import csv
+import json
+import time
+import signal
+import argparse
+import itertools
+import multiprocessing as mp
+import numpy as np
+from config import *
+from game_env import PacmanEnv, REWARDS
+from maps import load_map
+from agent import QLearningAgent
+from metrics import RollingMean
+from training import run_training_episode
+
+# Recherche d'hyperparamètres : chaque essai est un entraînement isolé dans un processus du pool.
+# Les paramètres sont passés à l'environnement et à l'agent de l'essai (jamais via les globales de config.py),
+# les essais qui font nettement moins bien que les autres au même stade sont arrêtés tôt.
+#
+# Fichier de recherche (JSON) :
+#   {"search": "grid" | "random", "trials": 20, "episodes": 3000, "seed": 0,
+#    "params": {"GAMMA": [0.9, 0.95, 0.99], "ALPHA_START": {"low": 0.05, "high": 0.5, "log": true}, "R_WALL": [-50, -10]},
+#    "report_every": 250, "window": 100, "warmup": 0.2, "min_trials": 4}
+#   grid   : produit cartésien des listes
+#   random : `trials` tirages, une valeur par liste ou uniforme dans [low, high] (log : uniforme en log)
+
+# Nom dans config.py -> attribut de QLearningAgent
+AGENT_PARAMS = {"ALPHA_START": "alpha", "ALPHA_MIN": "alpha_min", "ALPHA_DECAY_RATE": "alpha_decay",
+                "GAMMA": "gamma", "LAMBDA": "lam", "EPSILON_START": "epsilon", "EPSILON_DECAY_RATE": "epsilon_decay"}
+OTHER_PARAMS = ["ALGORITHM", "DISTANCE", "MAP"]
+SPEC_DEFAULTS = {"search": "grid", "trials": 10, "episodes": TOTAL_EPISODES, "seed": 0,
+                 "report_every": 250, "window": 100, "warmup": 0.2, "min_trials": 4}
+
+def load_spec(filename):
+    with open(filename) as f:
+        spec = {**SPEC_DEFAULTS, **json.load(f)}
+    unknown = set(spec["params"]) - set(AGENT_PARAMS) - set(REWARDS) - set(OTHER_PARAMS)
+    if unknown:
+        raise ValueError(f"Paramètres inconnus : {sorted(unknown)} "
+                         f"(possibles : {', '.join([*AGENT_PARAMS, *REWARDS, *OTHER_PARAMS])})")
+    return spec
+
+def expand(spec):
+    # -> liste des configurations {nom: valeur}
+    params = spec["params"]
+    if spec["search"] == "grid":
+        names = list(params)
+        for name in names:
+            if not isinstance(params[name], list):
+                raise ValueError(f"Recherche grid : {name} doit être une liste de valeurs")
+        return [dict(zip(names, values)) for values in itertools.product(*(params[n] for n in names))]
+    if spec["search"] != "random":
+        raise ValueError(f"Recherche inconnue : {spec['search']} (grid ou random)")
+
+    rng = np.random.default_rng(spec["seed"])
+    configs = []
+    for _ in range(spec["trials"]):
+        config = {}
+        for name, values in params.items():
+            if isinstance(values, list):
+                config[name] = values[int(rng.integers(len(values)))]
+            elif values.get("log"):
+                config[name] = float(np.exp(rng.uniform(np.log(values["low"]), np.log(values["high"]))))
+            else:
+                config[name] = float(rng.uniform(values["low"], values["high"]))
+        configs.append(config)
+    return configs
+
+_reports = None
+
+def _init_worker(reports):
+    # reports : float64[essais, points de contrôle] en mémoire partagée, NaN tant qu'un essai n'y est pas arrivé
+    global _reports
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _reports = reports
+
+def _report_grid(num_trials):
+    return np.frombuffer(_reports, dtype=np.float64).reshape(num_trials, -1)
+
+def should_prune(reports, trial, point, value, min_trials):
+    # Élagage par la médiane : arrêt si la moyenne glissante est sous la médiane des autres essais
+    # au même point de contrôle (au moins min_trials essais arrivés jusque-là)
+    others = np.delete(reports[:, point], trial)
+    others = others[~np.isnan(others)]
+    return len(others) >= min_trials and value < np.median(others)
+
+def run_trial(job):
+    trial, config, spec, seed, num_trials, out_dir = job
+    start = time.perf_counter()
+    env_seed, agent_seed = np.random.SeedSequence(seed).spawn(2)
+    game_map = load_map(config.get("MAP", MAP))
+    env = PacmanEnv(game_map, seed=env_seed, distance=config.get("DISTANCE", DISTANCE),
+                    rewards={name: value for name, value in config.items() if name in REWARDS})
+    agent = QLearningAgent(seed=agent_seed, algorithm=config.get("ALGORITHM", ALGORITHM))
+    for name, attr in AGENT_PARAMS.items():
+        if name in config: setattr(agent, attr, config[name])
+    if EXPERIENCE_SIZE: agent.enable_replay()
+
+    reports = _report_grid(num_trials)
+    avg_score = RollingMean(spec["window"])
+    warmup = int(spec["warmup"] * spec["episodes"])
+    status, best_avg, episodes_run = "done", float("-inf"), 0
+    for ep in range(spec["episodes"]):
+        score, _, _ = run_training_episode(env, agent)
+        avg = avg_score.add(score)
+        episodes_run = ep + 1
+
+        if episodes_run % spec["report_every"] == 0:
+            point = episodes_run // spec["report_every"] - 1
+            reports[trial, point] = avg
+            best_avg = max(best_avg, avg)
+            if episodes_run >= warmup and episodes_run < spec["episodes"] and \
+                    should_prune(reports, trial, point, avg, spec["min_trials"]):
+                status = "pruned"
+                break
+
+    if status == "done" and out_dir:
+        agent.save_model(os.path.join(out_dir, f"trial_{trial:03d}.bin"))
+    return {"trial": trial, **config, "status": status, "episodes": episodes_run,
+            "avg_score": avg_score.mean, "best_avg_score": max(best_avg, avg_score.mean),
+            "elapsed": time.perf_counter() - start}
+
+def write_results(filename, rows, names):
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+    columns = ["trial", *names, "status", "episodes", "avg_score", "best_avg_score", "elapsed"]
+    with open(filename, 'w', newline='') as f:
+        writer = csv.DictWriter(f, columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def print_results(rows, names):
+    print(f"{'essai':>5} {'statut':>7} {'épisodes':>8} {'moy. finale':>11} {'meilleure':>9}  paramètres")
+    for row in sorted(rows, key=lambda r: (r["status"] != "done", -r["avg_score"])):
+        params = " ".join(f"{name}={row[name]:.6g}" if isinstance(row[name], float) else f"{name}={row[name]}"
+                          for name in names)
+        print(f"{row['trial']:>5} {row['status']:>7} {row['episodes']:>8} {row['avg_score']:>11.1f} "
+              f"{row['best_avg_score']:>9.1f}  {params}")
+
+def sweep(spec, workers=None, out_dir=SWEEP_DIR, save_models=False):
+    configs = expand(spec)
+    workers = min(workers or os.cpu_count() or 1, len(configs))
+    points = spec["episodes"] // spec["report_every"]
+    reports = mp.RawArray('d', len(configs) * max(points, 1))
+    np.frombuffer(reports, dtype=np.float64)[:] = np.nan
+    seeds = np.random.SeedSequence(spec["seed"]).generate_state(len(configs))
+    jobs = [(i, config, spec, int(seeds[i]), len(configs), out_dir if save_models else None)
+            for i, config in enumerate(configs)]
+
+    print(f"Recherche {spec['search']} : {len(configs)} essais de {spec['episodes']} épisodes sur {workers} processus")
+    start = time.perf_counter()
+    rows = []
+    with mp.Pool(workers, initializer=_init_worker, initargs=(reports,)) as pool:
+        try:
+            for row in pool.imap_unordered(run_trial, jobs):
+                rows.append(row)
+                print(f"[{len(rows)}/{len(jobs)}] essai {row['trial']} : {row['status']} après {row['episodes']} épisodes, "
+                      f"moyenne {row['avg_score']:.1f} ({row['elapsed']:.0f}s)")
+        except KeyboardInterrupt:
+            print("\nArrêt manuel détecté, résultats partiels.")
+            pool.terminate()
+
+    names = list(spec["params"])
+    rows.sort(key=lambda r: r["trial"])
+    filename = os.path.join(out_dir, "results.csv")
+    write_results(filename, rows, names)
+    print_results(rows, names)
+    print(f"{len(rows)} essais en {time.perf_counter() - start:.0f}s, résultats dans {filename}")
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recherche d'hyperparamètres sur un pool de processus")
+    parser.add_argument("spec", help="fichier JSON décrivant la recherche (voir sweeps/example.json)")
+    parser.add_argument("--workers", type=int, default=None, help="processus (défaut : nombre de cœurs)")
+    parser.add_argument("--output", default=SWEEP_DIR, help="dossier des résultats")
+    parser.add_argument("--save-models", action="store_true", help="enregistre la Q-Table des essais terminés")
+    args = parser.parse_args()
+    sweep(load_spec(args.spec), args.workers, args.output, args.save_models)
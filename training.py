@@ -0,0 +1,23 @@
+from config import *
+
+def run_training_episode(env, agent, before_step=None):
+    # Un épisode d'entraînement, commun à main.train, aux workers de parallel.py et aux essais de sweep.py :
+    # un niveau terminé continue l'épisode au niveau suivant, puis traces effacées et epsilon diminué.
+    # before_step (optionnel) est appelé avant chaque pas (rendu).
+    # -> (score, pas du dernier niveau, fantômes mangés)
+    state = env.reset()
+    action = agent.choose_action(state)
+    done = False
+    while not done:
+        if before_step: before_step()
+        next_state, reward, done, info = env.step(action)
+        if info.get("level_cleared", False):
+            next_state = env.next_level()
+            done = False
+        next_action = agent.choose_action(next_state) if not done else None
+        agent.update(state, action, reward, next_state, next_action)
+        state = next_state
+        action = next_action
+    agent.reset_traces()
+    agent.decay_epsilon()
+    return env.score, env.steps, info.get("ghosts", 0)
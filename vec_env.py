@@ -0,0 +1,275 @@
+import numpy as np
+from config import *
+from maze import compile_maze, RAY_LENGTH
+from maps import load_map
+
+STATE_SIZE = 14  # 4 x (mur, fantome, nourriture) + any_scared + last_action
+
+class VecPacmanEnv:
+    def __init__(self, num_envs, seed=None, game_map=None, distance=DISTANCE):
+        self.num_envs = num_envs
+        self.maze_distance = distance == "MAZE"
+        self.rng = np.random.default_rng(seed)
+        self.game_map = game_map or load_map()
+
+        self.base_grid = np.array(self.game_map.grid, dtype=np.int8)
+        self.grid_shape = self.base_grid.shape
+        self.base_total_dots = int(np.count_nonzero((self.base_grid == DOT) | (self.base_grid == POWER)))
+
+        w = self.grid_shape[1]
+        self.pacman_start = self.game_map.pacman_start[0] * w + self.game_map.pacman_start[1]
+        self.ghost_starts = np.array([r * w + c for r, c in self.game_map.ghost_starts], dtype=np.intp)
+        self.num_ghosts = len(self.ghost_starts)
+
+        self._build_tables()
+
+        n, g = num_envs, self.num_ghosts
+        self.grid = np.empty((n,) + self.grid_shape, dtype=np.int8)
+        self.pacman_idx = np.zeros(n, dtype=np.intp)
+        self.ghost_idx = np.zeros((n, g), dtype=np.intp)
+        self.scared = np.zeros((n, g), dtype=np.int32)
+        self.lives = np.zeros(n, dtype=np.int32)
+        self.level = np.zeros(n, dtype=np.int32)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.ghosts_eaten = np.zeros(n, dtype=np.int32)
+        self.steps = np.zeros(n, dtype=np.int32)
+        self.max_steps = 2000
+        self.total_dots = np.zeros(n, dtype=np.int32)
+        self.last_action = np.zeros(n, dtype=np.int8)
+        self.ghost_move_prob = np.zeros(n)
+        self.power_duration = np.zeros(n, dtype=np.int32)
+
+        self.reset()
+
+    def _build_tables(self):
+        # Tables de la carte compilée (maze.py) converties en indices de cases à plat
+        maze = compile_maze(self.game_map.grid)
+        h, w = self.grid_shape
+        size = h * w
+        flat = lambda p: p[0] * w + p[1]
+
+        # Déplacement de Pac-Man : case d'arrivée (ou case actuelle si bloqué)
+        self.pac_next = np.tile(np.arange(size, dtype=np.intp)[:, None], (1, len(ACTIONS)))
+        self.pac_blocked = np.ones((size, len(ACTIONS)), dtype=bool)
+        # Déplacements légaux des fantômes, tassés en tête dans l'ordre de GHOST_DELTAS
+        self.ghost_moves = np.full((size, 4), -1, dtype=np.intp)
+        self.ghost_num_moves = np.zeros(size, dtype=np.intp)
+        # Rayons de 7 cases par direction, la case `size` sert de sentinelle hors grille
+        self.rays = np.full((size, len(ACTIONS), RAY_LENGTH), size, dtype=np.intp)
+
+        for r in range(h):
+            for c in range(w):
+                idx = r * w + c
+                for a in ACTIONS:
+                    next_pos = maze.next_cell[r][c][a]
+                    if next_pos is not None:
+                        self.pac_next[idx, a] = flat(next_pos)
+                        self.pac_blocked[idx, a] = False
+                    ray = maze.rays[r][c][a]
+                    self.rays[idx, a, :len(ray)] = [flat(p) for p in ray]
+                moves = maze.ghost_moves[r][c]
+                self.ghost_moves[idx, :len(moves)] = [flat(p) for p in moves]
+                self.ghost_num_moves[idx] = len(moves)
+
+        rows, cols = np.divmod(np.arange(size), w)
+        self.cell_rows, self.cell_cols = rows, cols
+        # Plus court chemin entre cases (`size` si inaccessible) : table (h * w)² seulement en DISTANCE = "MAZE".
+        # En Manhattan, écarts de lignes (h x h) et de colonnes (w x w) additionnés à la demande, en int16
+        # (moitié moins de mémoire à parcourir pour le where/argmin de get_states)
+        self.distance = maze.all_pairs_distances() if self.maze_distance else None
+        self.row_distance = np.abs(np.arange(h)[:, None] - np.arange(h)[None, :]).astype(np.int16)
+        self.col_distance = np.abs(np.arange(w)[:, None] - np.arange(w)[None, :]).astype(np.int16)
+
+    def _distance(self, a, b):
+        if self.distance is not None:
+            return self.distance[a, b]
+        return (self.row_distance[self.cell_rows[a], self.cell_rows[b]] +
+                self.col_distance[self.cell_cols[a], self.cell_cols[b]])
+
+    def _distances_from(self, pos):
+        # Distances de chaque case de pos vers toutes les cases -> (len(pos), h * w)
+        if self.distance is not None:
+            return self.distance[pos]
+        return (self.row_distance[self.cell_rows[pos]][:, :, None] +
+                self.col_distance[self.cell_cols[pos]][:, None, :]).reshape(len(pos), -1)
+
+    def reset(self):
+        self._reset_games(np.ones(self.num_envs, dtype=bool))
+        return self.get_states()
+
+    def _reset_games(self, mask):
+        self.level[mask] = 1
+        self.score[mask] = 0
+        self.lives[mask] = INITIAL_LIVES
+        self.ghosts_eaten[mask] = 0
+        self._start_level(mask)
+
+    def _next_level(self, mask):
+        self.level[mask] += 1
+        self._start_level(mask)
+
+    def _start_level(self, mask):
+        self.grid[mask] = self.base_grid
+        self.steps[mask] = 0
+        self.total_dots[mask] = self.base_total_dots
+        self._reset_positions(mask)
+        self.last_action[mask] = 4
+
+        level = self.level[mask]
+        self.ghost_move_prob[mask] = np.minimum(MAX_GHOST_SPEED,
+                                                LEVEL_ONE_GHOST_SPEED + (level - 1) * GHOST_SPEED_INC_PER_LEVEL)
+        self.power_duration[mask] = np.maximum(MIN_POWER_DURATION,
+                                               POWER_DURATION_BASE - (level - 1) * POWER_DURATION_DEC_PER_LEVEL)
+
+    def _reset_positions(self, mask):
+        self.pacman_idx[mask] = self.pacman_start
+        self.ghost_idx[mask] = self.ghost_starts
+        self.scared[mask] = 0
+
+    def step(self, actions):
+        n = self.num_envs
+        envs = np.arange(n)
+        actions = np.asarray(actions, dtype=np.intp)
+
+        self.steps += 1
+        rewards = np.full(n, float(R_STEP))
+        ghosts_before = self.ghosts_eaten.copy()
+
+        pos = self.pacman_idx
+        blocked = self.pac_blocked[pos, actions]
+        rewards[blocked] += R_WALL
+        self.pacman_idx = pos = self.pac_next[pos, actions]
+        self.last_action[~blocked] = actions[~blocked]
+
+        flat_grid = self.grid.reshape(n, -1)
+        cell = flat_grid[envs, pos]
+        ate_dot = cell == DOT
+        ate_power = cell == POWER
+        eaten = ate_dot | ate_power
+        flat_grid[envs[eaten], pos[eaten]] = EMPTY
+        rewards += R_DOT * ate_dot + R_POWER * ate_power
+        self.score += 10 * ate_dot + 50 * ate_power
+        self.total_dots -= eaten
+        self.scared[ate_power] = self.power_duration[ate_power, None]
+
+        cleared = self.total_dots == 0
+        game_won = cleared & (self.level >= MAX_LEVEL)
+        level_cleared = cleared & ~game_won
+        rewards[game_won] = R_GAME_WIN
+        rewards[level_cleared] = R_WIN
+
+        # Une partie touchée par un fantôme sort de la boucle (comme le return de PacmanEnv.step)
+        active = ~cleared
+        died = np.zeros(n, dtype=bool)
+        hit = np.zeros(n, dtype=bool)
+        rand = self.rng.random((self.num_ghosts, n, 3))
+        slots = np.arange(4)
+
+        for g in range(self.num_ghosts):
+            scared = self.scared[:, g]
+            scared -= active & (scared > 0)
+            is_scared = scared > 0
+            should_move = active & (is_scared | (rand[g, :, 0] < self.ghost_move_prob))
+
+            ghost_pos = self.ghost_idx[:, g]
+            moves = self.ghost_moves[ghost_pos]
+            num_moves = self.ghost_num_moves[ghost_pos]
+            valid = slots < num_moves[:, None]
+            dist = self._distance(moves, pos[:, None])
+
+            random_slot = np.minimum((rand[g, :, 2] * num_moves).astype(np.intp), np.maximum(num_moves - 1, 0))
+            flee_slot = np.argmax(np.where(valid, dist, -1), axis=1)
+            chase_slot = np.argmin(np.where(valid, dist, np.iinfo(dist.dtype).max), axis=1)
+            use_random = np.where(is_scared, rand[g, :, 1] < 0.2, rand[g, :, 1] >= 0.3)
+            slot = np.where(use_random, random_slot, np.where(is_scared, flee_slot, chase_slot))
+
+            move = should_move & (num_moves > 0)
+            ghost_pos[move] = moves[envs[move], slot[move]]
+
+            collide = active & (ghost_pos == pos)
+            eat = collide & is_scared
+            rewards[eat] += R_GHOST_EAT
+            self.score[eat] += 200
+            self.ghosts_eaten[eat] += 1
+            ghost_pos[eat] = self.ghost_starts[g]
+            scared[eat] = 0
+
+            caught = collide & ~is_scared
+            self.lives[caught] -= 1
+            dead = caught & (self.lives == 0)
+            hurt = caught & ~dead
+            rewards[dead] = R_DEATH
+            rewards[hurt] += R_DEATH / 4
+            died |= dead
+            hit |= hurt
+            active &= ~caught
+
+        self._reset_positions(hit)
+        self.last_action[hit] = 4
+
+        timeout = active & (self.steps >= self.max_steps)
+        dones = game_won | died | timeout
+
+        states = self.get_states()
+        infos = {
+            "level_cleared": level_cleared,
+            "game_won": game_won,
+            "died": died,
+            "hit": hit,
+            "ghosts": np.where(died | hit, self.ghosts_eaten, ghosts_before),
+            "score": self.score.copy(),
+            "level": self.level.copy(),
+            "steps": self.steps.copy(),
+            "final_states": states.copy(),
+        }
+
+        # Passage de niveau et auto-reset des parties terminées
+        restart = level_cleared | dones
+        if restart.any():
+            self._next_level(level_cleared)
+            self._reset_games(dones)
+            states[restart] = self.get_states(restart)
+
+        return states, rewards, dones, infos
+
+    def get_states(self, mask=None):
+        rows = np.arange(self.num_envs) if mask is None else np.flatnonzero(mask)
+        n = len(rows)
+        envs = np.arange(n)
+        pos = self.pacman_idx[rows]
+        pac_r, pac_c = self.cell_rows[pos], self.cell_cols[pos]
+        states = np.zeros((n, STATE_SIZE), dtype=np.int8)
+
+        # Pastille la plus proche : argmin renvoie la première en ordre ligne par ligne, comme le scan
+        grid = self.grid[rows].reshape(n, -1)
+        pellets = (grid == DOT) | (grid == POWER)
+        dist = self._distances_from(pos)
+        dist = np.where(pellets, dist, np.iinfo(dist.dtype).max)
+        target = np.argmin(dist, axis=1)
+        has_target = dist[envs, target] < grid.shape[1]
+        tgt_r, tgt_c = self.cell_rows[target], self.cell_cols[target]
+
+        # Premier fantôme de la liste présent sur chaque case : 1 normal, 2 effrayé
+        occupancy = np.zeros((n, grid.shape[1] + 1), dtype=np.int8)
+        scared = self.scared[rows]
+        for g in reversed(range(self.num_ghosts)):
+            occupancy[envs, self.ghost_idx[rows, g]] = np.where(scared[:, g] > 0, 2, 1)
+        seen = occupancy[envs[:, None, None], self.rays[pos]]
+        danger = (seen[:, :, :2] == 1).any(axis=2)
+        prey = (seen == 2).any(axis=2)
+
+        states[:, 0:12:3] = self.pac_blocked[pos]
+        states[:, 1:12:3] = np.where(danger, 1, np.where(prey, 2, 0))
+        if self.maze_distance:
+            food = ~self.pac_blocked[pos] & (self._distance(self.pac_next[pos], target[:, None]) < dist[envs, target][:, None])
+        else:
+            food = np.stack([tgt_r < pac_r, tgt_r > pac_r, tgt_c < pac_c, tgt_c > pac_c], axis=1)
+        states[:, 2:12:3] = food & has_target[:, None]
+        states[:, 12] = (scared > 0).any(axis=1)
+        states[:, 13] = self.last_action[rows]
+        return states
+
+    @staticmethod
+    def state_tuples(states):
+        return [((s[0], s[1], s[2]), (s[3], s[4], s[5]), (s[6], s[7], s[8]), (s[9], s[10], s[11]), s[12], s[13])
+                for s in states.tolist()]